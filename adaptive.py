@@ -0,0 +1,114 @@
+import collections
+import statistics
+
+import numpy as np
+from scipy.stats import t as student_t
+
+from aggregation import WeeklyStats
+from simulation import (
+    BURNOUT_THRESHOLD, DEFAULT_SEED, NUM_STUDENTS, WEEKS,
+    SimulationProgress, find_critical_week, new_seed, simulate_motivation, simulation_key,
+    stream_through_caches,
+)
+
+# 自适应蒙特卡洛默认参数：每批学生数、批数上下限、置信水平与收敛容差
+REPLICATE_SIZE = NUM_STUDENTS
+MIN_REPLICATES = 4
+MAX_REPLICATES = 64
+CONFIDENCE = 0.95
+WEEK_TOLERANCE = 0.5
+CURVE_TOLERANCE = 0.02
+
+# 自适应模拟结果：合并后的每周统计量、平均曲线的置信带、关键周及其置信区间、随机种子
+AdaptiveResult = collections.namedtuple(
+    "AdaptiveResult",
+    ["stats", "curve_lower", "curve_upper", "critical_week", "week_interval",
+     "replicates", "converged", "seed"],
+)
+
+
+# 关键周为整数，方差加上取整误差的方差 1/12（Sheppard 修正），各批相同时区间也不为零宽
+ROUNDING_VARIANCE = 1 / 12
+
+
+# 关键周的置信区间：基于各批次关键周的批均值法，批数少，使用 t 分布分位数；
+# 各批都未穿过阈值时区间为空
+def _week_interval(replicate_weeks, confidence):
+    weeks = np.array([np.nan if week is None else week for week in replicate_weeks], dtype=float)
+    if np.isnan(weeks).all():
+        return None, True
+    if np.isnan(weeks).any() or len(weeks) < 2:
+        return None, False
+    quantile = student_t.ppf(0.5 + confidence / 2, len(weeks) - 1)
+    half_width = quantile * np.sqrt((weeks.var(ddof=1) + ROUNDING_VARIANCE) / len(weeks))
+    return (float(weeks.mean() - half_width), float(weeks.mean() + half_width)), None
+
+
+# 逐批运行独立的重复模拟并合并统计量，直到目标量的置信区间半宽低于容差；
+# target 为 "week"（关键周）或 "curve"（平均曲线）
+def iter_adaptive_simulation(study_time, genderdif, initial_motivation,
+                             weeks=WEEKS, burnout_threshold=BURNOUT_THRESHOLD,
+                             seed=None, backend=None, target="week",
+                             replicate_size=REPLICATE_SIZE,
+                             min_replicates=MIN_REPLICATES, max_replicates=MAX_REPLICATES,
+                             confidence=CONFIDENCE, week_tolerance=WEEK_TOLERANCE,
+                             curve_tolerance=CURVE_TOLERANCE):
+    if seed is None:
+        seed = new_seed()
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+
+    stats = WeeklyStats(weeks)
+    replicate_weeks = []
+    converged = False
+    # 第 i 批使用种子 (seed, i)，各批相互独立且可复现
+    for index in range(max_replicates):
+        replicate = simulate_motivation(
+            study_time, genderdif, initial_motivation,
+            num_students=replicate_size, weeks=weeks, burnout_threshold=burnout_threshold,
+            seed=(seed, index), backend=backend,
+        )
+        stats.merge(replicate.stats)
+        replicate_weeks.append(find_critical_week(replicate.stats.mean, burnout_threshold))
+        yield SimulationProgress(weeks, stats.mean.copy(), stats.burnout_fraction)
+
+        if len(replicate_weeks) < min_replicates:
+            continue
+        if target == "curve":
+            curve_half_width = z * stats.std / np.sqrt(stats.count)
+            converged = bool(curve_half_width.max() <= curve_tolerance)
+        else:
+            interval, settled = _week_interval(replicate_weeks, confidence)
+            converged = settled if interval is None else (interval[1] - interval[0]) / 2 <= week_tolerance
+        if converged:
+            break
+
+    curve_half_width = z * stats.std / np.sqrt(stats.count)
+    interval, _ = _week_interval(replicate_weeks, confidence)
+    return AdaptiveResult(
+        stats,
+        stats.mean - curve_half_width,
+        stats.mean + curve_half_width,
+        find_critical_week(stats.mean, burnout_threshold),
+        interval,
+        len(replicate_weeks),
+        converged,
+        seed,
+    )
+
+
+# 带缓存的流式版本，与 simulation.stream_cached_simulation 共用进程内缓存与跨进程结果存储
+def stream_cached_adaptive_simulation(study_time, genderdif, initial_motivation,
+                                      seed=DEFAULT_SEED, weeks=WEEKS,
+                                      burnout_threshold=BURNOUT_THRESHOLD, backend=None,
+                                      target="week", week_tolerance=WEEK_TOLERANCE,
+                                      curve_tolerance=CURVE_TOLERANCE):
+    key = ("adaptive", target, week_tolerance, curve_tolerance) + simulation_key(
+        study_time, genderdif, initial_motivation, seed,
+        REPLICATE_SIZE, weeks, burnout_threshold, backend,
+    )
+    return (yield from stream_through_caches(key, AdaptiveResult, lambda: iter_adaptive_simulation(
+        *key[4:7],
+        weeks=weeks, burnout_threshold=burnout_threshold,
+        seed=seed, backend=backend, target=target,
+        week_tolerance=week_tolerance, curve_tolerance=curve_tolerance,
+    )))
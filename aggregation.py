@@ -0,0 +1,122 @@
+import numpy as np
+
+# 分位数草图（可选）：动机值按固定宽度分箱计数，各分块直方图直接相加即可合并。
+# 每个统计对象约多占 weeks × SKETCH_BINS × 4 字节，只在需要 percentile() 时启用
+SKETCH_LOWER = 0.0
+SKETCH_UPPER = 5.5
+SKETCH_BINS = 110
+
+
+# 每周的流式统计量：人数、均值、离差平方和、厌学人数，sketch=True 时另有动机直方图；
+# 内存只与周数有关，与学生人数无关
+class WeeklyStats:
+    def __init__(self, weeks, sketch=False):
+        self.weeks = weeks
+        self.count = 0
+        self.mean = np.zeros(weeks)
+        self.m2 = np.zeros(weeks)
+        self.burnout_count = np.zeros(weeks, dtype=np.int64)
+        self.histogram = np.zeros((weeks, SKETCH_BINS), dtype=np.int32) if sketch else None
+
+    @property
+    def sketch(self):
+        return self.histogram is not None
+
+    # 记录一个人群在某一周的状态；同一对象的每一周应包含同一批学生
+    def add(self, week, motivations, burned_out):
+        self.count = motivations.size
+        mean = motivations.mean(dtype=np.float64)
+        self.mean[week] = mean
+        self.m2[week] = np.square(motivations - mean, dtype=np.float64).sum()
+        self.burnout_count[week] = np.count_nonzero(burned_out)
+        if not self.sketch:
+            return
+
+        bins = ((motivations - SKETCH_LOWER) * (SKETCH_BINS / (SKETCH_UPPER - SKETCH_LOWER))).astype(np.int64)
+        np.clip(bins, 0, SKETCH_BINS - 1, out=bins)
+        self.histogram[week] = np.bincount(bins, minlength=SKETCH_BINS)
+
+    # 全部学生厌学后各周状态不再变化，直接复制最后一周的统计量
+    def fill_from(self, week):
+        self.mean[week+1:] = self.mean[week]
+        self.m2[week+1:] = self.m2[week]
+        self.burnout_count[week+1:] = self.burnout_count[week]
+        if self.sketch:
+            self.histogram[week+1:] = self.histogram[week]
+
+    @classmethod
+    def from_history(cls, motivation_history, burnout_history, sketch=False):
+        stats = cls(motivation_history.shape[0], sketch)
+        for week in range(stats.weeks):
+            stats.add(week, motivation_history[week], burnout_history[week])
+        return stats
+
+    # 由各周的动机之和、平方和与厌学人数构造（按分组用 np.bincount 累计时使用）
+    @classmethod
+    def from_sums(cls, count, sums, squares, burnout_count):
+        stats = cls(sums.shape[0])
+        stats.count = int(count)
+        stats.mean = sums / count
+        stats.m2 = np.maximum(squares - sums * stats.mean, 0)
+        stats.burnout_count = np.asarray(burnout_count, dtype=np.int64)
+        return stats
+
+    # 合并另一批独立学生的统计量（Chan 等人的并行方差公式）；
+    # 直方图只在双方都有时合并，否则合并结果不带直方图
+    def merge(self, other):
+        total = self.count + other.count
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count = other.count
+            self.mean = other.mean.copy()
+            self.m2 = other.m2.copy()
+            self.burnout_count = other.burnout_count.copy()
+            if self.sketch and other.sketch:
+                self.histogram = other.histogram.copy()
+            else:
+                self.histogram = None
+            return self
+
+        delta = other.mean - self.mean
+        self.m2 = self.m2 + other.m2 + delta**2 * (self.count * other.count / total)
+        self.mean = self.mean + delta * (other.count / total)
+        self.burnout_count = self.burnout_count + other.burnout_count
+        if self.sketch and other.sketch:
+            self.histogram += other.histogram
+        else:
+            self.histogram = None
+        self.count = total
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else np.full(self.weeks, np.nan)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    @property
+    def burnout_fraction(self):
+        return self.burnout_count / self.count if self.count else np.zeros(self.weeks)
+
+    # 每周第 q 百分位数（0-100），在分箱内线性插值，精度为一个分箱宽度；需要 sketch=True
+    def percentile(self, q):
+        if not self.sketch:
+            raise ValueError("percentile() requires WeeklyStats(..., sketch=True)")
+        cumulative = np.cumsum(self.histogram, axis=1)
+        target = q / 100 * self.count
+        bin_index = np.minimum((cumulative < target).sum(axis=1), SKETCH_BINS - 1)
+        weeks = np.arange(self.weeks)
+        below = np.where(bin_index > 0, cumulative[weeks, bin_index - 1], 0)
+        in_bin = self.histogram[weeks, bin_index]
+        fraction = np.where(in_bin > 0, (target - below) / np.maximum(in_bin, 1), 0)
+        bin_width = (SKETCH_UPPER - SKETCH_LOWER) / SKETCH_BINS
+        return SKETCH_LOWER + (bin_index + np.clip(fraction, 0, 1)) * bin_width
+
+    # 缓存的统计量在会话间共享，设为只读
+    def freeze(self):
+        for array in (self.mean, self.m2, self.burnout_count, self.histogram):
+            if array is not None:
+                array.setflags(write=False)
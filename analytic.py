@@ -0,0 +1,168 @@
+import argparse
+import collections
+import sys
+
+import numpy as np
+from scipy.special import ndtr
+
+from simulation import (
+    BURNOUT_THRESHOLD, DEFAULT_SEED, MAX_STUDY_TIME, WEEKS,
+    find_critical_week, gender_coefficient, simulate_motivation,
+)
+
+# 学生模型参数，与 simulation.iter_simulation 一致
+INITIAL_SD = 0.5
+INITIAL_RANGE = (1.0, 5.0)
+TRAIT_MEAN = 0.5
+TRAIT_SD = 0.1
+NOISE_SD = 0.08
+
+# 动机网格：未厌学学生的动机分布离散到步长 GRID_STEP 的格点上，阈值本身是一个格点；
+# 上界在初始动机上限之外再留 GRID_MARGIN_SD 倍的累计波动，单周转移核截断在 ±KERNEL_SD·σ（另加衰减量）
+GRID_STEP = 0.05
+GRID_MARGIN_SD = 5
+KERNEL_SD = 6
+
+# 学习效率与抗压能力的 Gauss-Hermite 节点数
+TRAIT_NODES = 2
+
+# 与蒙特卡洛对照的容差：平均动机曲线最大绝对误差、厌学比例最大绝对误差、关键周相差周数；
+# 曲线缓慢穿过阈值时蒙特卡洛自身的抽样误差就能让关键周移动一周，关键周容差取一周
+MEAN_TOLERANCE = 0.005
+BURNOUT_TOLERANCE = 0.01
+CRITICAL_WEEK_TOLERANCE = 1
+
+# 解析结果：每周平均动机、累计厌学比例（厌学时间的分布函数）与关键周
+AnalyticResult = collections.namedtuple(
+    "AnalyticResult", ["mean", "burnout_fraction", "critical_week"]
+)
+
+
+# 每周动机衰减量 genderdif·study_time·(1-e/2)·(1-r/2) 的求积节点与权重
+def _decay_nodes(study_time, genderdif):
+    x, w = np.polynomial.hermite_e.hermegauss(TRAIT_NODES)
+    w = w / w.sum()
+    factor = 1 - np.clip(TRAIT_MEAN + TRAIT_SD * x, 0, 1) * 0.5
+    decay = genderdif * study_time * np.outer(factor, factor)
+    return decay.ravel(), np.outer(w, w).ravel()
+
+
+# 初始动机 clip(N(m, 0.5), 1, 5) 落在各格点上的概率：区间内按格点中点切分，两端截断的点质量归到最近的格点
+def _initial_distribution(grid, initial_motivation):
+    lower, upper = INITIAL_RANGE
+    edges = np.concatenate(([-np.inf], (grid[1:] + grid[:-1]) / 2, [np.inf]))
+    mass = np.diff(ndtr((np.clip(edges, lower, upper) - initial_motivation) / INITIAL_SD))
+    mass[np.abs(grid - lower).argmin()] += ndtr((lower - initial_motivation) / INITIAL_SD)
+    mass[np.abs(grid - upper).argmin()] += ndtr((initial_motivation - upper) / INITIAL_SD)
+    return mass
+
+
+# E[Y; Y <= bound]，Y ~ N(mu, σ²)
+def _partial_mean(mu, bound):
+    z = (bound - mu) / NOISE_SD
+    return mu * ndtr(z) - NOISE_SD * np.exp(-z**2 / 2) / np.sqrt(2 * np.pi)
+
+
+# 确定性引擎：对每个衰减量节点，在动机网格上逐周传播仍未厌学学生的分布。
+# 新厌学学生停在的动机取值、留在阈值以上部分的期望都按正态分布精确计算，只有传播回网格时有离散误差
+def analytic_motivation(study_time, genderdif, initial_motivation,
+                        weeks=WEEKS, burnout_threshold=BURNOUT_THRESHOLD):
+    study_time = min(MAX_STUDY_TIME, study_time)
+    decay, decay_weights = _decay_nodes(study_time, genderdif)
+
+    lower, upper = INITIAL_RANGE
+    below = int(np.ceil(max(0, burnout_threshold - lower) / GRID_STEP))
+    above = int(np.ceil((upper + GRID_MARGIN_SD * NOISE_SD * np.sqrt(weeks) - burnout_threshold) / GRID_STEP))
+    grid = burnout_threshold + GRID_STEP * np.arange(-below, above + 1)
+
+    # 从每个格点出发一周后的去向，形状：(衰减量节点, 格点)。
+    # 第三维依次为：仍在阈值以上部分的期望动机、新厌学部分停留动机的期望（含 simulation 中的下限 0）、厌学概率
+    drift = grid - decay[:, None]
+    crossed = _partial_mean(drift, burnout_threshold)
+    outcomes = np.stack([
+        drift - crossed,
+        crossed - _partial_mean(drift, 0),
+        ndtr((burnout_threshold - drift) / NOISE_SD),
+    ], axis=2)
+    # 落在 (阈值, 阈值 + h/2] 的未厌学学生归到阈值格点
+    to_threshold = ndtr((burnout_threshold + GRID_STEP / 2 - drift) / NOISE_SD) - outcomes[:, :, 2]
+
+    # 平移不变的转移核：kernel[:, reach + k] 为一周内动机移动 k 个格点的概率
+    reach = int(np.ceil((KERNEL_SD * NOISE_SD + decay.max()) / GRID_STEP))
+    offset = GRID_STEP * np.arange(-reach, reach + 1)
+    kernel = (ndtr((offset + GRID_STEP / 2 + decay[:, None]) / NOISE_SD)
+              - ndtr((offset - GRID_STEP / 2 + decay[:, None]) / NOISE_SD))
+
+    alive = np.tile(_initial_distribution(grid, initial_motivation), (decay.size, 1))
+    flows = np.empty((weeks, decay.size, 3))
+    for week in range(weeks):
+        flows[week] = np.einsum("dn,dnk->dk", alive, outcomes)
+        moved = np.empty_like(alive)
+        for node in range(decay.size):
+            moved[node] = np.convolve(alive[node], kernel[node], "same")
+        moved[:, :below] = 0
+        moved[:, below] = np.einsum("dn,dn->d", alive, to_threshold)
+        alive = moved
+
+    # 已厌学学生的动机保持不变：第 t 周平均动机 = 本周仍在阈值以上的部分 + 截至本周所有厌学学生停留的动机
+    frozen = np.cumsum(flows[:, :, 1], axis=0)
+    mean = (flows[:, :, 0] + frozen) @ decay_weights
+    burnout_fraction = np.cumsum(flows[:, :, 2], axis=0) @ decay_weights
+    return AnalyticResult(mean, burnout_fraction, find_critical_week(mean, burnout_threshold))
+
+
+# 对照检验的参数组合：覆盖学习时长、性别与初始动机的范围
+VALIDATION_CASES = [
+    (study_time, gender, initial_motivation)
+    for study_time in (5, 20, 40, 60, 80, 100)
+    for gender in ("male", "female", "other")
+    for initial_motivation in (1.0, 1.5, 2.5, 3.0, 4.0)
+]
+
+
+# 与大样本蒙特卡洛对照，返回每个组合的误差；只有一方穿过阈值时关键周误差记为 None，视为不通过
+def validate(cases=VALIDATION_CASES, num_students=200_000, seed=DEFAULT_SEED):
+    rows = []
+    for study_time, gender, initial_motivation in cases:
+        genderdif = gender_coefficient(gender)
+        analytic = analytic_motivation(study_time, genderdif, initial_motivation)
+        stats = simulate_motivation(
+            study_time, genderdif, initial_motivation, num_students=num_students,
+            seed=seed,
+        ).stats
+        monte_carlo_week = find_critical_week(stats.mean, BURNOUT_THRESHOLD)
+        if analytic.critical_week is None or monte_carlo_week is None:
+            week_error = None if analytic.critical_week != monte_carlo_week else 0
+        else:
+            week_error = abs(analytic.critical_week - monte_carlo_week)
+        mean_error = float(np.abs(analytic.mean - stats.mean).max())
+        burnout_error = float(np.abs(analytic.burnout_fraction - stats.burnout_fraction).max())
+        rows.append({
+            "study_time": study_time, "gender": gender, "initial_motivation": initial_motivation,
+            "mean_error": mean_error, "burnout_error": burnout_error, "week_error": week_error,
+            "ok": (mean_error <= MEAN_TOLERANCE and burnout_error <= BURNOUT_TOLERANCE
+                   and week_error is not None and week_error <= CRITICAL_WEEK_TOLERANCE),
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Validate the analytic engine against a large Monte Carlo run."
+    )
+    parser.add_argument("--students", type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    rows = validate(num_students=args.students)
+    for row in rows:
+        print("{study_time:>5} {gender:>6} {initial_motivation:>4} "
+              "mean {mean_error:.4f}  burnout {burnout_error:.4f}  week {week}  "
+              "{status}".format(week="one-sided" if row["week_error"] is None else row["week_error"],
+                                status="ok" if row["ok"] else "FAIL", **row))
+    print(f"tolerance: mean {MEAN_TOLERANCE}, burnout {BURNOUT_TOLERANCE}, "
+          f"week {CRITICAL_WEEK_TOLERANCE}")
+    return 0 if all(row["ok"] for row in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,108 +1,124 @@
-from shiny import App, ui, render, reactive, Inputs, Outputs, Session
-import numpy as np
-import matplotlib.pyplot as plt
+from shiny import App, ui, render, reactive, req, Inputs, Outputs, Session
 import os
-import matplotlib.font_manager as fm
-
-# 中英双语词典
-lang_dict = {
-    "zh": {
-        "page_title": "*学习倦怠/厌学*关键期计算模拟",
-        "language_select": "请选择语言 / Pls Select Language",
-        "classes_question_num": "1.",
-        "classes_question_text": "您个人每周的学习时长是多少课时？/您班级或学校每周人均学习时长是多少课时？（含自习课、作业；一课时=40/45分钟）",
-        "classes_hint": "提示：请输入0-100之间的整数，超过100将自动按100处理",
-        "gender_question_num": "2.",
-        "gender_question_text": "请选择性别？",
-        "gender_male": "男",
-        "gender_female": "女",
-        "gender_other": "为班级/学校做计算、无性别",
-        "motivation_question_num": "3. ",
-        "motivation_question_text": "请输入您个人/您班级学生/您学校学生的初始学习动机值（1-4分之间，可以有小数点）",
-        "motivation_ref_method": "测试参考（也可自行选用量表）：",
-        "motivation_step1": "1. 先完成以下3道自测题，每题选择对应选项；",
-        "motivation_step2": "2. 计算3道题的平均分作为初始动机值填入上方输入框。(精确到0.1)",
-        "motivation_self1": "问题1：在学校我感到自己进发出能量",
-        "motivation_self2": "问题2：我觉得我的学习目标明确，且很有意义",
-        "motivation_self3": "问题3：当我学习时，时间总是过得飞快",
-        "score_1": "1分 - 没有",
-        "score_2": "2分 - 有一点",
-        "score_3": "3分 - 还不错",
-        "score_4": "4分 - 经常",
-        "motivation_formula_title": "平均分计算公式：",
-        "motivation_formula": "初始动机值 = （问题1得分 + 问题2得分 + 问题3得分） ÷ 3",
-        "motivation_example": "例如：若3道题得分分别为3分、4分、3分，则初始动机值 = （3+4+3）÷3 ≈ 3.3分",
-        "question_source_title": "问题来源参考文献：",
-        "question_source": "Teuber, Z., Tang, X., Salmela-Aro, K., & Wild, E. (2021). Assessing engagement in Chinese upper secondary school students using the Chinese version of the schoolwork engagement inventory: energy, dedication, and absorption (CEDA). Frontiers in Psychology, 12, 638189.",
-        "submit_btn": "计算评价结果",
-        "reset_btn": "重新评价",
-        "complete_all_hint": "请完成所有问题后再提交",
-        "motivation_input_hint": "请根据以下参考问题和计算方法，输入您的初始学习动机值",
-        "result_title": "您的评价结果",
-        "motivation_start_point": "动机起始点: ",
-        "chart_title": "学习动机趋势预测",
-        "chart_xlabel": "周数",
-        "chart_ylabel": "平均学习动机水平",
-        "chart_legend_study_time": "{study_time}课时/周",
-        "chart_legend_burnout": "厌学阈值",
-        "chart_annotation_burnout": "第{week}周达到厌学阈值",
-        "chart_region_burnout": "厌学区域",
-        "chart_region_low": "低动机区域",
-        "chart_region_high": "高动机区域",
-        "gender_text_male": "男性",
-        "gender_text_female": "女性",
-        "gender_text_other": "整体"
-    },
-    "en": {
-        "page_title": "*Academic Burnout* Critical Week Computation",
-        "language_select": "Pls Select Language / 选择语言",
-        "classes_question_num": "1.",
-        "classes_question_text": "What is your weekly study hours in term of class hours/What is the average weekly study hours of your class or school (including self-study, homework; 1 class hour = 40/45 minutes)?",
-        "classes_hint": "Hint: Please enter an integer between 0-100; values over 100 will be treated as 100",
-        "gender_question_num": "2.",
-        "gender_question_text": "Pls select the gender?",
-        "gender_male": "Male",
-        "gender_female": "Female",
-        "gender_other": "For class/school calculation (no gender) or Not applicable above",
-        "motivation_question_num": "3. ",
-        "motivation_question_text": "Please enter your/ your group's initial learning motivation score (within 1-4 points, decimal is allowed)",
-        "motivation_ref_method": "Illustrative questions (Other tests are also welcomed):",
-        "motivation_step1": "1. First complete the following 3 self-assessment questions and select the corresponding option for each;",
-        "motivation_step2": "2. Calculate the average score of the 3 questions and enter it as the initial motivation value above (accurate to 0.1).",
-        "motivation_self1": "Question 1: At school I am bursting with energy",
-        "motivation_self2": "Question 2: I find the schoolwork full of meaning and purpose",
-        "motivation_self3": "Question 3: Time flies when I am studying",
-        "score_1": "1 point - Not at all",
-        "score_2": "2 points - Slightly",
-        "score_3": "3 points - Moderately",
-        "score_4": "4 points - Always",
-        "motivation_formula_title": "Average Score Calculation Formula:",
-        "motivation_formula": "Initial Motivation = (Score of Q1 + Score of Q2 + Score of Q3) ÷ 3",
-        "motivation_example": "Example: If scores are 3, 4, 3, then Initial Motivation = (3+4+3) ÷3 ≈ 3.3 points",
-        "question_source": "Teuber, Z., Tang, X., Salmela-Aro, K., & Wild, E. (2021). Assessing engagement in Chinese upper secondary school students using the Chinese version of the schoolwork engagement inventory: energy, dedication, and absorption (CEDA). Frontiers in Psychology, 12, 638189.",
-        "question_source_title": "References for the sample questions:",
-        "submit_btn": "Calculate Evaluation Result",
-        "reset_btn": "Re-evaluate",
-        "complete_all_hint": "Please complete all questions before submitting",
-        "motivation_input_hint": "Please enter your initial learning motivation based on the reference questions and calculation method below",
-        "result_title": "Your Evaluation Result",
-        "motivation_start_point": "Motivation Starting Point: ",
-        "chart_title": "Learning Motivation Trend Prediction",
-        "chart_xlabel": "Weeks",
-        "chart_ylabel": "Average Learning Motivation Level",
-        "chart_legend_study_time": "{study_time} Class Hours/Week",
-        "chart_legend_burnout": "Burnout Threshold",
-        "chart_annotation_burnout": "Reaches Burnout Threshold at Week {week}",
-        "chart_region_burnout": "Burnout Zone",
-        "chart_region_low": "Low Motivation Zone",
-        "chart_region_high": "High Motivation Zone",
-        "gender_text_male": "Male",
-        "gender_text_female": "Female",
-        "gender_text_other": "Overall"
+import asyncio
+import base64
+import functools
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Mount, Route
+import batch
+import charts
+import lookup
+import metrics
+import result_store
+from adaptive import stream_cached_adaptive_simulation
+from analytic import analytic_motivation
+from charts import chart_payload, render_motivation_chart
+from client_chart import output_motivation_chart, render_motivation_chart_data
+from i18n import I18N_MESSAGE, i18n_dependency, i18n_keys, i18n_messages, i18n_text
+from labels import lang_dict
+from metrics import span
+from roster import read_roster, simulate_roster, summary_rows
+from simulation import (
+    NUM_STUDENTS, WEEKS, BURNOUT_THRESHOLD, MAX_STUDY_TIME, GENDER_COEFFICIENTS,
+    DEFAULT_SEED, advance, gender_coefficient, resolve_backend, stream_cached_simulation,
+    warm_up_backend,
+)
+
+_startup_begin = time.perf_counter()
+
+# 模拟与绘图在有界线程池中执行，避免阻塞事件循环
+WORKER_POOL = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("BURNOUT_WORKERS", "4")),
+    thread_name_prefix="burnout-worker"
+)
+
+# 模拟模式："fixed" 固定人数单次模拟；"adaptive" 逐批增加重复模拟直到关键周的置信区间足够窄，并绘制置信带；
+# "analytic" 在动机网格上逐周传播未厌学学生的分布并对参数分布数值积分，结果确定、没有抽样误差
+SIMULATION_MODE = os.environ.get("BURNOUT_SIM_MODE", "fixed")
+
+# 流式模拟：每隔若干周把阶段结果推送到图表；0 表示关闭，算完后一次性显示
+STREAM_CHUNK_WEEKS = int(os.environ.get("BURNOUT_STREAM_CHUNK_WEEKS", "0"))
+# 两次阶段结果推送的最小间隔（秒）；间隔内的阶段结果跳过，只推送最新的一份
+STREAM_MIN_INTERVAL = 0.25
+
+# 图表输出模式："server" 在服务器端渲染PNG，"client" 只发送曲线数据由浏览器绘图
+CHART_MODE = os.environ.get("BURNOUT_CHART_MODE", "server")
+
+# 启动时预先解析每种语言的性别文字
+gender_texts = {
+    lang: {
+        "male": labels["gender_text_male"],
+        "female": labels["gender_text_female"],
+        "other": labels["gender_text_other"],
     }
+    for lang, labels in lang_dict.items()
+}
+
+# 启动预热：编译后端、字体与图表，首个用户无需承担加载耗时；
+# 预热出错时服务照常启动（请求时再加载），但 /healthz 返回 503 并列出出错的步骤
+startup_errors = []
+for step, warm_up in (("backend", warm_up_backend), ("charts", functools.partial(charts.warm_up, lang_dict))):
+    try:
+        warm_up()
+    except Exception as error:
+        startup_errors.append(f"{step}: {type(error).__name__}: {error}")
+
+# 预计算查找表（python lookup.py 离线生成）；不存在或已过期时全部请求实时模拟
+LOOKUP_TABLE = lookup.load_lookup_table()
+
+startup_status = {
+    "ready": not startup_errors,
+    "errors": startup_errors,
+    "startup_seconds": round(time.perf_counter() - _startup_begin, 3),
+    "backend": resolve_backend(),
+    "simulation_mode": SIMULATION_MODE,
+    "chart_mode": CHART_MODE,
+    "fonts": charts.FONT_FAMILIES,
+    # 未找到 SimHei 时中文使用备选字体，图表仍可显示，但字形取决于系统字体
+    "zh_font_fallback": charts.FONT_FAMILIES["zh"] == charts.FALLBACK_ZH_FAMILIES,
+    "lookup_table": LOOKUP_TABLE is not None,
+    "result_store": result_store.RESULT_STORE_PATH or None,
 }
 
+# 分享链接的查询参数：?class_count=..&gender=..&initial_motivation=..&seed=..
+def share_query(study_time, gender, initial_motivation, seed):
+    return "?" + urllib.parse.urlencode({
+        "class_count": study_time, "gender": gender,
+        "initial_motivation": initial_motivation, "seed": seed,
+    })
+
+
+# 解析URL中的随机种子；没有或无效时返回 None
+def url_seed(url_search):
+    seed = urllib.parse.parse_qs(url_search.lstrip("?")).get("seed", [""])[0]
+    return int(seed) if seed.isdigit() else None
+
+
+# 解析完整的分享链接；参数不全或无效时返回 None
+def shared_link_params(url_search):
+    query = urllib.parse.parse_qs(url_search.lstrip("?"))
+    seed = url_seed(url_search)
+    try:
+        study_time = min(MAX_STUDY_TIME, float(query["class_count"][0]))
+        gender = query["gender"][0]
+        initial_motivation = float(query["initial_motivation"][0])
+    except (KeyError, ValueError):
+        return None
+    if (seed is None or study_time < 0 or gender not in GENDER_COEFFICIENTS
+            or not 1 <= initial_motivation <= 4):
+        return None
+    return study_time, gender, initial_motivation, seed
+
+
 # UI组件定义
+# 可切换语言的文字
+def text(lang, key):
+    return i18n_text(lang_dict[lang], key)
+
 def question_block(question_num, question_text, lang):
     return ui.div(
         ui.h4(
@@ -117,10 +133,10 @@ def question_block(question_num, question_text, lang):
             f"q{question_num.strip('. ')}",
             "",
             {
-                "1": lang_dict[lang]["score_1"],
-                "2": lang_dict[lang]["score_2"],
-                "3": lang_dict[lang]["score_3"],
-                "4": lang_dict[lang]["score_4"]
+                "1": text(lang, "score_1"),
+                "2": text(lang, "score_2"),
+                "3": text(lang, "score_3"),
+                "4": text(lang, "score_4")
             },
             inline=True
         ),
@@ -131,10 +147,10 @@ def classes_question_block(lang):
     return ui.div(
         ui.h4(
             ui.span(
-                lang_dict[lang]["classes_question_num"],
+                text(lang, "classes_question_num"),
                 style="display: inline-block; background-color: #3498db; color: white; padding: 3px 8px; border-radius: 12px; margin-right: 8px;"
             ),
-            lang_dict[lang]["classes_question_text"],
+            text(lang, "classes_question_text"),
             style="margin-bottom: 15px; color: #3498db; font-weight: bold;"
         ),
         ui.div(
@@ -145,7 +161,7 @@ def classes_question_block(lang):
                 min=0,
                 step=1
             ),
-            ui.p(lang_dict[lang]["classes_hint"],
+            ui.p(text(lang, "classes_hint"),
                 style="font-size: 14px; color: #7f8c8d; margin-top: 5px;"),
         ),
         style="padding: 20px; border: 1px solid #ddd; border-radius: 10px; margin-bottom: 30px; box-shadow: 0 2px 5px rgba(0,0,0,0.05);"
@@ -155,10 +171,10 @@ def motivation_input_block(lang):
     return ui.div(
         ui.h4(
             ui.span(
-                lang_dict[lang]["motivation_question_num"], 
+                text(lang, "motivation_question_num"), 
                 style="display: inline-block; background-color: #3498db; color: white; padding: 3px 8px; border-radius: 12px; margin-right: 8px;"
             ),
-            lang_dict[lang]["motivation_question_text"],
+            text(lang, "motivation_question_text"),
             style="margin-bottom: 15px; color: #34495e;"
         ),
         ui.input_numeric(
@@ -170,53 +186,53 @@ def motivation_input_block(lang):
             step=0.1
         ),
         ui.div(
-            ui.p(lang_dict[lang]["motivation_ref_method"], style="font-weight: bold; margin: 15px 0 10px 0;"),
-            ui.p(lang_dict[lang]["motivation_step1"], style="margin: 8px 0 0 15px;"),
-            ui.p(lang_dict[lang]["motivation_step2"], style="margin: 5px 0 0 15px;"),
+            ui.p(text(lang, "motivation_ref_method"), style="font-weight: bold; margin: 15px 0 10px 0;"),
+            ui.p(text(lang, "motivation_step1"), style="margin: 8px 0 0 15px;"),
+            ui.p(text(lang, "motivation_step2"), style="margin: 5px 0 0 15px;"),
             
             ui.div(
-                ui.p(lang_dict[lang]["motivation_self1"], style="font-weight: 500; margin: 15px 0 8px 0;"),
+                ui.p(text(lang, "motivation_self1"), style="font-weight: 500; margin: 15px 0 8px 0;"),
                 ui.tags.ul(
-                    ui.tags.li(lang_dict[lang]["score_1"]),
-                    ui.tags.li(lang_dict[lang]["score_2"]),
-                    ui.tags.li(lang_dict[lang]["score_3"]),
-                    ui.tags.li(lang_dict[lang]["score_4"])
+                    ui.tags.li(text(lang, "score_1")),
+                    ui.tags.li(text(lang, "score_2")),
+                    ui.tags.li(text(lang, "score_3")),
+                    ui.tags.li(text(lang, "score_4"))
                 ),
                 style="margin-left: 15px;"
             ),
             
             ui.div(
-                ui.p(lang_dict[lang]["motivation_self2"], style="font-weight: 500; margin: 15px 0 8px 0;"),
+                ui.p(text(lang, "motivation_self2"), style="font-weight: 500; margin: 15px 0 8px 0;"),
                 ui.tags.ul(
-                    ui.tags.li(lang_dict[lang]["score_1"]),
-                    ui.tags.li(lang_dict[lang]["score_2"]),
-                    ui.tags.li(lang_dict[lang]["score_3"]),
-                    ui.tags.li(lang_dict[lang]["score_4"])
+                    ui.tags.li(text(lang, "score_1")),
+                    ui.tags.li(text(lang, "score_2")),
+                    ui.tags.li(text(lang, "score_3")),
+                    ui.tags.li(text(lang, "score_4"))
                 ),
                 style="margin-left: 15px;"
             ),
             
             ui.div(
-                ui.p(lang_dict[lang]["motivation_self3"], style="font-weight: 500; margin: 15px 0 8px 0;"),
+                ui.p(text(lang, "motivation_self3"), style="font-weight: 500; margin: 15px 0 8px 0;"),
                 ui.tags.ul(
-                    ui.tags.li(lang_dict[lang]["score_1"]),
-                    ui.tags.li(lang_dict[lang]["score_2"]),
-                    ui.tags.li(lang_dict[lang]["score_3"]),
-                    ui.tags.li(lang_dict[lang]["score_4"])
+                    ui.tags.li(text(lang, "score_1")),
+                    ui.tags.li(text(lang, "score_2")),
+                    ui.tags.li(text(lang, "score_3")),
+                    ui.tags.li(text(lang, "score_4"))
                 ),
                 style="margin-left: 15px;"
             ),
             
             ui.div(
-                ui.p(lang_dict[lang]["motivation_formula_title"], style="font-weight: bold; margin: 15px 0 10px 0;"),
-                ui.p(lang_dict[lang]["motivation_formula"], 
+                ui.p(text(lang, "motivation_formula_title"), style="font-weight: bold; margin: 15px 0 10px 0;"),
+                ui.p(text(lang, "motivation_formula"), 
                      style="margin: 0 0 0 15px; padding: 10px; background-color: #f0f7ff; border-left: 3px solid #3498db;"),
-                ui.p(lang_dict[lang]["motivation_example"], 
+                ui.p(text(lang, "motivation_example"), 
                      style="margin: 8px 0 0 15px; font-style: italic;")
             ),
             ui.div(
-                ui.p(lang_dict[lang]["question_source_title"], style="font-weight: bold; margin: 15px 0 10px 0;"),
-                ui.p(lang_dict[lang]["question_source"], 
+                ui.p(text(lang, "question_source_title"), style="font-weight: bold; margin: 15px 0 10px 0;"),
+                ui.p(text(lang, "question_source"), 
                      style="margin: 8px 0 0 15px; font-style: italic;font-weight: bold; font-family: 'SimHei', sans-serif;")
             ),
             
@@ -229,19 +245,19 @@ def gender_question_block(lang):
     return ui.div(
         ui.h4(
             ui.span(
-                lang_dict[lang]["gender_question_num"], 
+                text(lang, "gender_question_num"), 
                 style="display: inline-block; background-color: #3498db; color: white; padding: 3px 8px; border-radius: 12px; margin-right: 8px;"
             ),
-            lang_dict[lang]["gender_question_text"],
+            text(lang, "gender_question_text"),
             style="margin-bottom: 15px; color: #34495e;"
         ),
         ui.input_radio_buttons(
             "gender",
             "",
             {
-                "male": lang_dict[lang]["gender_male"],
-                "female": lang_dict[lang]["gender_female"],
-                "other": lang_dict[lang]["gender_other"]
+                "male": text(lang, "gender_male"),
+                "female": text(lang, "gender_female"),
+                "other": text(lang, "gender_other")
             },
             inline=True
         ),
@@ -261,7 +277,7 @@ def questions_ui2(lang):
         ui.div(
             ui.input_action_button(
                 "submit", 
-                lang_dict[lang]["submit_btn"],
+                text(lang, "submit_btn"),
                 style="background-color: #3498db; color: white; border: none; padding: 10px 20px; font-size: 16px; border-radius: 5px; cursor: pointer;"
             ),
             style="text-align: center; margin-bottom: 40px;"
@@ -269,28 +285,64 @@ def questions_ui2(lang):
         id="content_container2"
     )
 
+# 名单模式：上传每个学生的参数，逐个学生模拟
+def roster_block(lang):
+    return ui.div(
+        ui.h4(text(lang, "roster_title"), style="margin-bottom: 15px; color: #34495e;"),
+        ui.p(text(lang, "roster_hint"), style="font-size: 14px; color: #7f8c8d;"),
+        ui.input_file("roster", "", accept=[".csv", ".parquet"]),
+        ui.div(
+            ui.input_action_button(
+                "roster_submit",
+                text(lang, "roster_submit_btn"),
+                style="background-color: #3498db; color: white; border: none; padding: 10px 20px; font-size: 16px; border-radius: 5px; cursor: pointer;"
+            ),
+            style="text-align: center;"
+        ),
+        id="roster_container",
+        style="padding: 20px; border: 1px solid #ddd; border-radius: 10px; margin-bottom: 30px; box-shadow: 0 2px 5px rgba(0,0,0,0.05);"
+    )
+
+def form_ui(lang):
+    return ui.div(
+        questions_ui1(lang),
+        ui.p(text(lang, "motivation_input_hint"),
+             style="text-align: center; color: #7f8c8d; margin-bottom: 40px; font-size: 18px;"),
+        questions_ui2(lang),
+        roster_block(lang)
+    )
+
 def results_ui(lang):
     return ui.div(
         ui.div(
-            ui.h3(lang_dict[lang]["result_title"], style="text-align: center; margin-bottom: 20px; color: #2c3e50;"),
+            ui.h3(text(lang, "result_title"), style="text-align: center; margin-bottom: 20px; color: #2c3e50;"),
             ui.hr(style="margin-bottom: 30px;"),
             
             ui.div(
-                ui.span(lang_dict[lang]["motivation_start_point"], style="font-size: 20px;"),
+                ui.span(text(lang, "motivation_start_point"), style="font-size: 20px;"),
                 ui.span(ui.output_text("avg_score"), style="font-size: 36px; font-weight: bold; color: #3498db;"),
                 style="text-align: center; margin-bottom: 30px;"
             ),
             
             ui.div(
-                ui.h4(lang_dict[lang]["chart_title"], style="text-align: center; margin: 20px 0;"),
-                ui.output_plot("motivation_agent", width="100%", height="500px"),
+                ui.h4(text(lang, "chart_title"), style="text-align: center; margin: 20px 0;"),
+                (output_motivation_chart("motivation_agent") if CHART_MODE == "client"
+                 else ui.output_ui("motivation_agent", style="min-height: 500px;")),
                 style="margin: 20px 0; padding: 10px; border: 1px solid #ddd; border-radius: 8px;"
             ),
+
+            # 名单模式下的全体与各分组结果
+            ui.output_ui("roster_summary"),
+
+            ui.div(
+                ui.output_ui("share_link"),
+                style="text-align: center; font-size: 14px; color: #7f8c8d;"
+            ),
             
             ui.div(
                 ui.input_action_button(
                     "reset", 
-                    lang_dict[lang]["reset_btn"],
+                    text(lang, "reset_btn"),
                     style="background-color: #95a5a6; color: white; border: none; padding: 8px 16px; font-size: 14px; border-radius: 5px; cursor: pointer; margin-top: 30px;"
                 ),
                 style="text-align: center;"
@@ -301,8 +353,9 @@ def results_ui(lang):
         id="result_container"
     )
 
-# 主UI
+# 主UI：表单与结果页都只构建一次（默认中文），提交、重置时切换显示，切换语言时只替换文字
 app_ui = ui.page_fluid(
+    i18n_dependency,
     ui.div(
         ui.input_radio_buttons(
             "lang",
@@ -314,241 +367,339 @@ app_ui = ui.page_fluid(
         style="text-align: center; margin-bottom: 30px; font-size: 16px;"
     ),
     
-    ui.h2(ui.output_text("page_title"), style="text-align: center; margin-bottom: 30px; color: #2c3e50;"),
-    ui.div(id="dynamic_content"),
+    ui.h2(text("zh", "page_title"), style="text-align: center; margin-bottom: 30px; color: #2c3e50;"),
+    ui.navset_hidden(
+        ui.nav_panel("form", form_ui("zh"), value="form"),
+        ui.nav_panel("results", results_ui("zh"), value="results"),
+        id="view"
+    ),
+    ui.busy_indicators.use(),
     style="max-width: 900px; margin: 0 auto; padding: 20px;"
 )
 
+# 各语言的文字更新消息，启动时生成一次
+I18N_MESSAGES = i18n_messages(lang_dict, i18n_keys(app_ui))
+
 # 服务器逻辑
 def server(input: Inputs, output: Outputs, session: Session):
-    submitted = reactive.Value(False)
-    
+    metrics.inc("sessions_total")
+    metrics.add_gauge("active_sessions", 1)
+    session.on_ended(lambda: metrics.add_gauge("active_sessions", -1))
+
     # 修复：在服务器内部定义反应式语言变量，确保在反应式上下文中
     @reactive.calc
     def current_lang():
         return input.lang()
 
-    @output
-    @render.text
-    def page_title():
-        return lang_dict[current_lang()]["page_title"]
-
-    # 监听语言变化，更新UI
+    # 语言切换：发送预先生成的文字更新消息，页面结构和已填写的内容保持不变
     @reactive.Effect
-    def _update_ui():
-        # 移除所有旧内容
-        ui.remove_ui(selector="#dynamic_content *")
-        ui.remove_ui(selector="#result_container")
-        
-        # 根据提交状态插入对应UI
-        if not submitted():
-            ui.insert_ui(
-                ui.div(
-                    questions_ui1(current_lang()),
-                    ui.p(lang_dict[current_lang()]["motivation_input_hint"], 
-                         style="text-align: center; color: #7f8c8d; margin-bottom: 40px; font-size: 18px;"),
-                    questions_ui2(current_lang())
-                ),
-                selector="#dynamic_content"
-            )
-        else:
-            ui.insert_ui(results_ui(current_lang()), selector="#dynamic_content")
-
-    # 提交按钮逻辑
+    @reactive.event(input.lang, ignore_init=True)
+    async def _update_language():
+        metrics.inc("language_switches_total")
+        await session.send_custom_message(I18N_MESSAGE, I18N_MESSAGES[current_lang()])
+
+    # 当前计算的参数：(学习时长, 性别, 初始动机, 随机种子)；名单模式下为 None
+    current_run = reactive.Value(None)
+    # 名单模式的名单列数组（roster.Roster）；表单模式下为 None
+    current_roster = reactive.Value(None)
+
+    def _run(study_time, gender, initial_motivation, seed):
+        current_run.set((study_time, gender, initial_motivation, seed))
+        current_roster.set(None)
+        # 新的提交会取消本会话中尚未完成的旧计算
+        roster_task.cancel()
+        simulation_task.cancel()
+        simulation_progress.set(None)
+        simulation_task.invoke(study_time, gender, initial_motivation, seed)
+        ui.update_navs("view", selected="results")
+
+    # 提交按钮逻辑：URL中带有随机种子时使用该种子，否则使用默认种子
     @reactive.Effect
     @reactive.event(input.submit)
     def _submit():
         if (input.class_count() is not None and 
             input.gender() and 
             input.initial_motivation() is not None):
-            submitted.set(True)
-            ui.remove_ui(selector="#content_container1")
-            ui.remove_ui(selector="#content_container2")
-            ui.insert_ui(results_ui(current_lang()), selector="#dynamic_content")
+            metrics.inc("submits_total")
+            seed = url_seed(session.clientdata.url_search())
+            _run(
+                min(MAX_STUDY_TIME, input.class_count()),
+                input.gender(),
+                input.initial_motivation(),
+                DEFAULT_SEED if seed is None else seed
+            )
         else:
             ui.notification_show(lang_dict[current_lang()]["complete_all_hint"], type="warning")
 
-    # 重置按钮逻辑
+    # 分享链接：URL中带有全部参数和随机种子时直接显示对应曲线
+    @reactive.Effect
+    def _open_shared_link():
+        params = shared_link_params(session.clientdata.url_search())
+        if params is not None:
+            metrics.inc("shared_links_total")
+            with reactive.isolate():
+                _run(*params)
+
+    # 名单提交：文件在线程池中解析，出错时提示具体的行；随机种子的来源与表单提交相同
+    @reactive.Effect
+    @reactive.event(input.roster_submit)
+    async def _submit_roster():
+        labels = lang_dict[current_lang()]
+        files = input.roster()
+        if not files:
+            ui.notification_show(labels["roster_missing"], type="warning")
+            return
+        metrics.inc("roster_submits_total")
+        loop = asyncio.get_running_loop()
+        try:
+            students = await loop.run_in_executor(
+                WORKER_POOL, read_roster, files[0]["datapath"], files[0]["name"]
+            )
+        except ValueError as error:
+            ui.notification_show(labels["roster_error"].format(error=error), type="error")
+            return
+
+        seed = url_seed(session.clientdata.url_search())
+        current_run.set(None)
+        current_roster.set(students)
+        simulation_task.cancel()
+        roster_task.cancel()
+        roster_task.invoke(students, DEFAULT_SEED if seed is None else seed)
+        ui.update_navs("view", selected="results")
+
+    # 重置按钮逻辑：回到表单，保留已填写的内容
     @reactive.Effect
     @reactive.event(input.reset)
     def _reset():
-        submitted.set(False)
-        ui.remove_ui(selector="#result_container")
-        ui.insert_ui(
-            ui.div(
-                questions_ui1(current_lang()),
-                ui.p(lang_dict[current_lang()]["motivation_input_hint"], 
-                     style="text-align: center; color: #7f8c8d; margin-bottom: 40px; font-size: 18px;"),
-                questions_ui2(current_lang())
-            ),
-            selector="#dynamic_content"
-        )
+        ui.update_navs("view", selected="form")
 
     @output
     @render.text
     def avg_score():
-        return round(input.initial_motivation(), 1)
+        if current_roster() is not None:
+            return round(float(current_roster().initial_motivations.mean()), 1)
+        req(current_run())
+        return round(current_run()[2], 1)
 
     @output
-    @render.plot
-    def motivation_agent():
-        # 字体配置
-        plt.rcParams["axes.unicode_minus"] = False
-        font_prop = None
-        
-        if current_lang() == "zh":
-            # 中文：尝试加载SimHei字体
-            try:
-                font_path = os.path.join(os.path.dirname(__file__), "fonts", "simhei.ttf")
-                if os.path.exists(font_path):
-                    font_prop = fm.FontProperties(fname=font_path)
-                    plt.rcParams["font.family"] = font_prop.get_name()
-                else:
-                    plt.rcParams["font.family"] = ["WenQuanYi Micro Hei", "Heiti TC", "sans-serif"]
-            except:
-                plt.rcParams["font.family"] = ["WenQuanYi Micro Hei", "Heiti TC", "sans-serif"]
-        else:
-            # 英文：使用默认字体
-            plt.rcParams["font.family"] = ["Arial", "sans-serif"]
-
-        # 模拟数据计算
-        num_students = 1000
-        weeks = 70
-        study_time = min(100, input.class_count())
-        burnout_threshold = 1.0
-        
-        # 性别差异系数
-        genderdif = 0.0043 if input.gender() == "male" else 0.0051 if input.gender() == "female" else 0.0047
-        gender_text = (lang_dict[current_lang()]["gender_text_male"] if input.gender() == "male" 
-                      else lang_dict[current_lang()]["gender_text_female"] if input.gender() == "female" 
-                      else lang_dict[current_lang()]["gender_text_other"])
-
-        # 初始化动机
-        base_motivation = input.initial_motivation()
-        initial_motivations = np.random.normal(base_motivation, 0.5, num_students)
-        initial_motivations = np.clip(initial_motivations, 1, 5)
-
-        # 其他参数初始化
-        learning_efficiencies = np.clip(np.random.normal(0.5, 0.1, num_students), 0, 1)
-        stress_resistances = np.clip(np.random.normal(0.5, 0.1, num_students), 0, 1)
-
-        # 结果存储
-        motivation_history = np.zeros((weeks, num_students))
-        burnout_history = np.zeros((weeks, num_students), dtype=bool)
-        burnout_weeks = np.full(num_students, np.nan)
-
-        # 每周动机变化模拟
-        for week in range(weeks):
-            for student in range(num_students):
-                if week > 0 and burnout_history[week-1, student]:
-                    motivation_history[week, student] = motivation_history[week-1, student]
-                    burnout_history[week, student] = True
-                    continue
-
-                actual_study_time = study_time
-                prev_motivation = initial_motivations[student] if week == 0 else motivation_history[week-1, student]
-
-                # 动机衰减计算
-                base_decay = genderdif * actual_study_time
-                efficiency_factor = 1 - learning_efficiencies[student] * 0.5
-                resistance_factor = 1 - stress_resistances[student] * 0.5
-                motivation_decay = base_decay * efficiency_factor * resistance_factor
-
-                # 随机波动
-                random_fluctuation = np.random.normal(0, 0.08)
-
-                # 更新动机
-                current_motivation = max(0, prev_motivation - motivation_decay + random_fluctuation)
-                motivation_history[week, student] = current_motivation
-
-                # 检查厌学
-                if current_motivation <= burnout_threshold:
-                    burnout_history[week, student] = True
-                    if np.isnan(burnout_weeks[student]):
-                        burnout_weeks[student] = week + 1
-
-        # 计算平均动机
-        avg_motivations = np.mean(motivation_history, axis=1)
-
-        # 绘制图表
-        plt.figure(figsize=(10, 6))
-
-        # 平均动机曲线
-        plt.plot(
-            range(1, weeks+1), 
-            avg_motivations, 
-            '-', linewidth=2.5, 
-            color='blue', 
-            label=lang_dict[current_lang()]["chart_legend_study_time"].format(study_time=study_time)
+    @render.ui
+    def share_link():
+        req(current_run())
+        study_time, gender, initial_motivation, seed = current_run()
+        return ui.a(
+            lang_dict[current_lang()]["share_link"].format(seed=seed),
+            href=share_query(study_time, gender, initial_motivation, seed)
         )
 
-        # 标注与厌学阈值的交点
-        cross_point = None
-        for week_idx in range(1, weeks):
-            if (avg_motivations[week_idx-1] >= burnout_threshold and 
-                avg_motivations[week_idx] <= burnout_threshold):
-                cross_point = (week_idx + 1, burnout_threshold)
-                break
-        if cross_point:
-            plt.scatter(
-                cross_point[0], cross_point[1], 
-                color='red', s=100, 
-                edgecolor='black', linewidth=1.5, zorder=5
+    # 流式模拟的阶段结果：(学习时长, 性别, 截至目前的平均动机, 置信带)
+    simulation_progress = reactive.Value(None)
+
+    # 模拟计算：只依赖学习时长、性别和初始动机，在线程池中逐块执行；
+    # 结果为 (学习时长, 性别, 平均动机曲线, 置信带)
+    @reactive.extended_task
+    async def simulation_task(study_time, gender, initial_motivation, seed):
+        # 固定模式优先查预计算表（仅限生成该表时使用的种子），网格外再实时模拟
+        if SIMULATION_MODE == "fixed" and LOOKUP_TABLE is not None and seed == LOOKUP_TABLE.meta["seed"]:
+            with span("simulation", mode="lookup"):
+                found = LOOKUP_TABLE.lookup(study_time, gender, initial_motivation)
+            if found is not None:
+                return study_time, gender, found[0], None
+
+        # 耗时为整个计算的墙钟时间，包含线程池排队与流式推送
+        loop = asyncio.get_running_loop()
+        with metrics.request_profile("simulation") as profile, span("simulation", mode=SIMULATION_MODE):
+            if SIMULATION_MODE == "analytic":
+                result = await loop.run_in_executor(
+                    WORKER_POOL, profile.run, analytic_motivation,
+                    study_time, gender_coefficient(gender), initial_motivation, WEEKS, BURNOUT_THRESHOLD
+                )
+                return study_time, gender, result.mean, None
+
+            if SIMULATION_MODE == "adaptive":
+                # 自适应模式每完成一批重复模拟汇报一次
+                stream = stream_cached_adaptive_simulation(
+                    study_time, gender_coefficient(gender), initial_motivation,
+                    seed=seed, weeks=WEEKS, burnout_threshold=BURNOUT_THRESHOLD
+                )
+            else:
+                stream = stream_cached_simulation(
+                    study_time, gender_coefficient(gender), initial_motivation,
+                    seed=seed, num_students=NUM_STUDENTS, weeks=WEEKS,
+                    burnout_threshold=BURNOUT_THRESHOLD, chunk_weeks=STREAM_CHUNK_WEEKS or WEEKS
+                )
+            begin = last_push = time.monotonic()
+            while True:
+                progress, result = await loop.run_in_executor(WORKER_POOL, profile.run, advance, stream)
+                if progress is None:
+                    break
+                now = time.monotonic()
+                # 固定人数模式按已完成周数估计剩余耗时，最终结果很快就到时不再推送阶段结果
+                # （最后一份阶段结果即最终曲线）；自适应模式每批都是完整曲线，只按间隔推送
+                remaining = (now - begin) * (WEEKS - progress.weeks_done) / progress.weeks_done
+                if (STREAM_CHUNK_WEEKS and now - last_push >= STREAM_MIN_INTERVAL
+                        and (SIMULATION_MODE == "adaptive" or remaining >= STREAM_MIN_INTERVAL)):
+                    # 阶段结果推送到图表
+                    last_push = now
+                    async with reactive.lock():
+                        simulation_progress.set((study_time, gender, progress.avg_motivations, None))
+                        await reactive.flush()
+
+        band = (result.curve_lower, result.curve_upper) if SIMULATION_MODE == "adaptive" else None
+        return study_time, gender, result.stats.mean, band
+
+    # 名单模拟：每个学生使用自己的参数，结果为全体、各性别与各分组的每周统计量
+    @reactive.extended_task
+    async def roster_task(students, seed):
+        loop = asyncio.get_running_loop()
+        with metrics.request_profile("roster") as profile, span("simulation", mode="roster"):
+            return await loop.run_in_executor(WORKER_POOL, profile.run, simulate_roster, students, seed)
+
+    # 流式模拟进行中，图表显示的是阶段结果
+    @reactive.calc
+    def chart_is_partial():
+        return (current_roster() is None and simulation_task.status() == "running"
+                and simulation_progress() is not None)
+
+    # 图表曲线：名单模式显示全体学生的平均动机；流式模拟进行中显示阶段结果，完成后显示最终结果
+    @reactive.calc
+    def chart_curve():
+        if current_roster() is not None:
+            cohort = roster_task.result().groups[0]
+            return round(cohort.mean_study_time, 1), "other", cohort.stats.mean, None
+        if chart_is_partial():
+            return simulation_progress()
+        return simulation_task.result()
+
+    def gender_text(gender):
+        return gender_texts[current_lang()].get(gender, gender_texts[current_lang()]["other"])
+
+    @output
+    @render.ui
+    def roster_summary():
+        req(current_roster())
+        labels = lang_dict[current_lang()]
+        cell_style = "padding: 6px 10px; border-bottom: 1px solid #ddd; text-align: right;"
+        columns = ["roster_col_group", "roster_col_students", "roster_col_study_time",
+                   "roster_col_initial_motivation", "roster_col_critical_week",
+                   "roster_col_final_motivation", "roster_col_burnout"]
+        rows = []
+        for row in summary_rows(roster_task.result()):
+            label = {"cohort": labels["roster_cohort"], "gender": gender_text(row["label"])}.get(
+                row["kind"], row["label"]
             )
-            plt.annotate(
-                lang_dict[current_lang()]["chart_annotation_burnout"].format(week=cross_point[0]), 
-                xy=cross_point, xytext=(5, 10), textcoords='offset points',
-                fontsize=10, 
-                bbox=dict(boxstyle="round,pad=0.3", fc="white", ec='red', alpha=0.8),
-                fontproperties=font_prop if current_lang() == "zh" else None
+            values = [
+                row["students"], row["mean_class_count"], row["mean_initial_motivation"],
+                row["critical_week"] or labels["roster_not_reached"],
+                row["final_avg_motivation"], f'{row["final_burnout_fraction"]:.1%}',
+            ]
+            rows.append(ui.tags.tr(
+                ui.tags.td(label, style=cell_style.replace("right", "left")),
+                *[ui.tags.td(str(value), style=cell_style) for value in values],
+                style="font-weight: bold;" if row["kind"] == "cohort" else None,
+            ))
+        return ui.div(
+            ui.h4(labels["roster_summary_title"], style="text-align: center; margin: 20px 0;"),
+            ui.tags.table(
+                ui.tags.thead(ui.tags.tr(*[ui.tags.th(labels[key], style=cell_style) for key in columns])),
+                ui.tags.tbody(*rows),
+                style="width: 100%; border-collapse: collapse; font-size: 14px;"
+            ),
+            style="margin: 20px 0; overflow-x: auto;"
+        )
+
+    if CHART_MODE == "client":
+        # 客户端模式：只发送曲线数据，由浏览器绘图
+        @output
+        @render_motivation_chart_data
+        def motivation_agent():
+            study_time, gender, avg_motivations, band = chart_curve()
+            with span("chart_payload"):
+                return chart_payload(
+                    avg_motivations, study_time, gender_text(gender),
+                    lang_dict[current_lang()], BURNOUT_THRESHOLD, weeks=WEEKS, band=band
+                )
+    else:
+        # 绘图同样在线程池中执行，语言切换只触发重新绘图
+        @reactive.extended_task
+        async def chart_task(avg_motivations, study_time, gender_label, lang, band):
+            # 各绘图阶段的耗时在 charts 中分别记录，这里是包含排队的总耗时
+            loop = asyncio.get_running_loop()
+            with metrics.request_profile("chart") as profile, span("chart"):
+                return await loop.run_in_executor(
+                    WORKER_POOL,
+                    functools.partial(
+                        profile.run, render_motivation_chart,
+                        avg_motivations, study_time, gender_label, lang_dict[lang], lang,
+                        weeks=WEEKS, band=band
+                    )
+                )
+
+        # 最近一次提交绘制的参数
+        last_chart = [None]
+
+        # 取消只放弃等待，线程池中的绘制仍会完成：阶段结果不打断正在进行的绘制，
+        # 等它结束（状态变化使本效果重新执行）后只绘制最新的一份；最终结果总是立即绘制
+        @reactive.Effect
+        def _render_chart():
+            study_time, gender, avg_motivations, band = chart_curve()
+            args = (avg_motivations, study_time, gender_text(gender), current_lang(), band)
+            previous = last_chart[0]
+            if (previous is not None and args[0] is previous[0] and args[4] is previous[4]
+                    and args[1:4] == previous[1:4]):
+                return
+            if chart_is_partial() and chart_task.status() == "running":
+                return
+            last_chart[0] = args
+            chart_task.cancel()
+            chart_task.invoke(*args)
+
+        @output
+        @render.ui
+        def motivation_agent():
+            # 被新的绘图任务取消时保留当前图像
+            req(chart_task.status() != "cancelled", cancel_output=True)
+            png = chart_task.result()
+            return ui.img(
+                src="data:image/png;base64," + base64.b64encode(png).decode("ascii"),
+                style="width: 100%; height: auto;"
             )
 
-        # 厌学阈值线
-        plt.axhline(
-            y=burnout_threshold, 
-            color='r', linestyle='--', linewidth=1.5, 
-            label=lang_dict[current_lang()]["chart_legend_burnout"]
-        )
+# 就绪检查：启动预热完成后返回200
+async def healthz(request):
+    return JSONResponse(startup_status, status_code=200 if startup_status["ready"] else 503)
 
-        # 动机区域背景色
-        plt.fill_between(
-            range(1, weeks+1), 0, 1.0, 
-            color='red', alpha=0.1, 
-            label=lang_dict[current_lang()]["chart_region_burnout"]
-        )
-        plt.fill_between(
-            range(1, weeks+1), 1.0, 2.5, 
-            color='orange', alpha=0.1, 
-            label=lang_dict[current_lang()]["chart_region_low"]
-        )
-        plt.fill_between(
-            range(1, weeks+1), 2.5, 5.0, 
-            color='green', alpha=0.1, 
-            label=lang_dict[current_lang()]["chart_region_high"]
-        )
 
-        # 图表属性
-        plt.title(
-            f'{gender_text} {lang_dict[current_lang()]["chart_title"]}',
-            fontproperties=font_prop if current_lang() == "zh" else None,
-            fontsize=14
-        )
-        plt.xlabel(
-            lang_dict[current_lang()]["chart_xlabel"],
-            fontproperties=font_prop if current_lang() == "zh" else None,
-            fontsize=12
-        )
-        plt.ylabel(
-            lang_dict[current_lang()]["chart_ylabel"],
-            fontproperties=font_prop if current_lang() == "zh" else None,
-            fontsize=12
-        )
-        plt.grid(True, linestyle='--', alpha=0.7)
-        plt.xlim(1, weeks)
-        plt.ylim(0, 5)
-        plt.legend(prop=font_prop if current_lang() == "zh" else None)
-        plt.tight_layout()
+# Prometheus 文本格式的指标：各阶段耗时、会话与操作计数、进程内存与CPU
+async def metrics_endpoint(request):
+    return PlainTextResponse(metrics.render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+# 批量计算：POST 一个CSV（class_count, gender, initial_motivation），流式返回每行的关键周与统计量
+async def batch_scores(request):
+    upload = await batch.spool_upload(request.stream())
+    # 编码与表头在发送响应头之前检查，无效时返回 400
+    try:
+        records = batch.open_upload(upload)
+    except ValueError as error:
+        upload.close()
+        return PlainTextResponse(f"{error}\n", status_code=400)
+
+    async def body():
+        try:
+            async for text in batch.aiter_scored_csv(records, batch.batch_pool()):
+                yield text
+        finally:
+            upload.close()
+
+    return StreamingResponse(body(), media_type="text/csv")
+
 
-        return plt.gcf()
+shiny_app = App(app_ui, server)
 
-app = App(app_ui, server)
+# HTTP接口与 Shiny 应用挂载在同一个 ASGI 应用中
+routes = [
+    Route("/healthz", healthz),
+    Route("/metrics", metrics_endpoint),
+    Route("/api/batch", batch_scores, methods=["POST"]),
+]
+app = Starlette(routes=routes + [Mount("/", app=shiny_app)])
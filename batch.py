@@ -0,0 +1,243 @@
+import argparse
+import asyncio
+import codecs
+import collections
+import csv
+import io
+import itertools
+import math
+import multiprocessing
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from simulation import (
+    BURNOUT_THRESHOLD, DEFAULT_SEED, GENDER_COEFFICIENTS, MAX_STUDY_TIME, NUM_STUDENTS, WEEKS,
+    cached_simulation, find_critical_week, gender_coefficient,
+)
+
+# 批量计算：逐行读取CSV（学习时长, 性别, 初始动机），按块分发到多个进程，按输入顺序逐块写出结果；
+# 同时在途的块数有上限，内存只取决于块大小与进程数，与文件行数无关
+INPUT_FIELDS = ["class_count", "gender", "initial_motivation"]
+OUTPUT_FIELDS = INPUT_FIELDS + [
+    "critical_week", "final_avg_motivation", "final_std_motivation", "final_burnout_fraction",
+    "error",
+]
+
+BATCH_WORKERS = int(os.environ.get("BURNOUT_BATCH_WORKERS", str(os.cpu_count() or 1)))
+BATCH_CHUNK_ROWS = int(os.environ.get("BURNOUT_BATCH_CHUNK_ROWS", "64"))
+# 每个进程最多排队两块
+BATCH_MAX_PENDING = 2 * BATCH_WORKERS
+BATCH_SPOOL_BYTES = 1 << 20
+# 上传文件依次尝试的编码：UTF-8（可带BOM），以及 Excel 中文环境导出的 GBK（GB18030 兼容）
+BATCH_ENCODINGS = ("utf-8-sig", "gb18030")
+REQUIRED_FIELDS = ["class_count", "initial_motivation"]
+
+# 无法读取的输入行，在结果中以一行 error 代替
+RowError = collections.namedtuple("RowError", ["message"])
+
+
+# 解析一行输入，学习时长与初始动机的约束与网页表单一致
+def parse_row(record):
+    class_count = float(record["class_count"])
+    gender = (record.get("gender") or "other").strip().lower()
+    initial_motivation = float(record["initial_motivation"])
+    if not (math.isfinite(class_count) and class_count >= 0):
+        raise ValueError("class_count must be a finite number >= 0")
+    if gender not in GENDER_COEFFICIENTS:
+        raise ValueError(f"unknown gender: {gender}")
+    if not 1 <= initial_motivation <= 4:
+        raise ValueError("initial_motivation must be between 1 and 4")
+    return min(MAX_STUDY_TIME, class_count), gender, initial_motivation
+
+
+def score_row(record):
+    if isinstance(record, RowError):
+        return {"error": record.message}
+    row = {field: record.get(field) for field in INPUT_FIELDS}
+    try:
+        study_time, gender, initial_motivation = parse_row(record)
+    except (KeyError, TypeError, ValueError) as error:
+        row["error"] = str(error)
+        return row
+
+    # 与网页使用相同的随机种子和规模，结果与网页一致；重复参数命中进程内缓存
+    result = cached_simulation(
+        study_time, gender_coefficient(gender), initial_motivation,
+        seed=DEFAULT_SEED, num_students=NUM_STUDENTS, weeks=WEEKS,
+        burnout_threshold=BURNOUT_THRESHOLD,
+    )
+    stats = result.stats
+    row.update(
+        critical_week=find_critical_week(stats.mean, BURNOUT_THRESHOLD),
+        final_avg_motivation=round(float(stats.mean[-1]), 4),
+        final_std_motivation=round(float(stats.std[-1]), 4),
+        final_burnout_fraction=round(float(stats.burnout_fraction[-1]), 4),
+    )
+    return row
+
+
+# 在工作进程中执行：计算一块输入行
+def score_chunk(records):
+    return [score_row(record) for record in records]
+
+
+def chunked(records, size=BATCH_CHUNK_ROWS):
+    records = iter(records)
+    while chunk := list(itertools.islice(records, size)):
+        yield chunk
+
+
+def format_rows(rows, header=False):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, OUTPUT_FIELDS, extrasaction="ignore", lineterminator="\n")
+    if header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+# 工作进程使用 spawn 启动，避免在多线程的服务器进程中 fork
+def make_pool(workers=BATCH_WORKERS):
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+_pool = None
+
+
+# HTTP接口共用的进程池，首次使用时创建
+def batch_pool():
+    global _pool
+    if _pool is None:
+        _pool = make_pool()
+    return _pool
+
+
+# 同步版本（命令行）：按输入顺序逐块返回结果，在途块数不超过 max_pending
+def iter_scored_chunks(records, pool, chunk_size=BATCH_CHUNK_ROWS, max_pending=BATCH_MAX_PENDING):
+    pending = collections.deque()
+    for chunk in chunked(records, chunk_size):
+        pending.append(pool.submit(score_chunk, chunk))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+# HTTP上传先写入临时文件（超过 BATCH_SPOOL_BYTES 落盘）：Starlette 的流式响应与读取请求体不能同时进行
+async def spool_upload(byte_chunks):
+    spool = tempfile.SpooledTemporaryFile(max_size=BATCH_SPOOL_BYTES)
+    async for data in byte_chunks:
+        spool.write(data)
+    spool.seek(0)
+    return spool
+
+
+# 整个文件按候选编码逐块试解码，返回第一个能完整解码的编码；都不能时抛出 ValueError
+def detect_encoding(binary, encodings=BATCH_ENCODINGS):
+    for encoding in encodings:
+        binary.seek(0)
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            while data := binary.read(1 << 16):
+                decoder.decode(data)
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            continue
+        binary.seek(0)
+        return encoding
+    raise ValueError(f"input is not valid text in any of: {', '.join(encodings)}")
+
+
+# 在返回响应之前检查上传内容：编码、表头与必需的列；无效时抛出 ValueError
+def open_upload(binary):
+    text = io.TextIOWrapper(binary, encoding=detect_encoding(binary), newline="")
+    records = csv.DictReader(text)
+    try:
+        fieldnames = records.fieldnames
+    except csv.Error as error:
+        raise ValueError(f"cannot parse CSV header: {error}") from error
+    if not fieldnames:
+        raise ValueError("input is empty")
+    missing = [field for field in REQUIRED_FIELDS if field not in fieldnames]
+    if missing:
+        raise ValueError(f"missing columns: {', '.join(missing)}")
+    return records
+
+
+# 逐行读取；无法解析的行以 RowError 代替，继续读取后续行
+def read_records(records):
+    while True:
+        try:
+            yield next(records)
+        except StopIteration:
+            return
+        except csv.Error as error:
+            yield RowError(f"near line {records.line_num + 1}: {error}")
+
+
+def _submit_chunk(loop, pool, chunk):
+    try:
+        return loop.run_in_executor(pool, score_chunk, chunk)
+    except Exception as error:
+        future = loop.create_future()
+        future.set_exception(error)
+        return future
+
+
+# 一块计算失败（如工作进程退出）时，该块每行输出错误，其余块照常返回
+async def _chunk_rows(chunk, future):
+    try:
+        return await future
+    except Exception as error:
+        message = f"{type(error).__name__}: {error}"
+        return [{**{field: record.get(field) for field in INPUT_FIELDS}, "error": message}
+                if not isinstance(record, RowError) else {"error": record.message}
+                for record in chunk]
+
+
+# 异步版本（HTTP）：按输入顺序逐块返回CSV文本，不阻塞事件循环
+async def aiter_scored_csv(records, pool, chunk_size=BATCH_CHUNK_ROWS,
+                           max_pending=BATCH_MAX_PENDING):
+    loop = asyncio.get_running_loop()
+    pending = collections.deque()
+    yield format_rows([], header=True)
+    for chunk in chunked(read_records(records), chunk_size):
+        pending.append((chunk, _submit_chunk(loop, pool, chunk)))
+        if len(pending) >= max_pending:
+            yield format_rows(await _chunk_rows(*pending.popleft()))
+    while pending:
+        yield format_rows(await _chunk_rows(*pending.popleft()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Batch-compute burnout critical weeks for rows of "
+                    "(class_count, gender, initial_motivation) from a CSV file."
+    )
+    parser.add_argument("input", help="input CSV path, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="output CSV path (default: stdout)")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--chunk-rows", type=int, default=BATCH_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8-sig")
+    target = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        with make_pool(args.workers) as pool:
+            target.write(format_rows([], header=True))
+            chunks = iter_scored_chunks(
+                read_records(csv.DictReader(source)), pool, args.chunk_rows, max_pending=2 * args.workers
+            )
+            for rows in chunks:
+                target.write(format_rows(rows))
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+
+import matplotlib
+import matplotlib.image
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from scipy.stats import mannwhitneyu, norm
+
+import charts
+from analytic import analytic_motivation
+from labels import lang_dict
+from simulation import (
+    BURNOUT_THRESHOLD, DEFAULT_SEED, GENDER_COEFFICIENTS, NUM_STUDENTS, WEEKS,
+    resolve_backend, simulate_motivation, warm_up_backend,
+)
+
+# 性能基准：模拟（不同人数与周数 × 各性别系数）与绘图（zh/en 字体 × 各阶段）的耗时，
+# 以及每个模拟规模的平均动机曲线，保存为 JSON 基线；compare 对比两份基线，
+# 报告耗时回归并检验两者的平均动机曲线在统计上等价（可用于验证新的模拟引擎）
+BENCH_DIR = os.path.join(os.path.dirname(__file__), "benchmarks")
+
+SIMULATION_SIZES = [(NUM_STUDENTS, WEEKS), (10_000, WEEKS), (100_000, WEEKS), (NUM_STUDENTS, 2 * WEEKS)]
+QUICK_SIMULATION_SIZES = [(NUM_STUDENTS, WEEKS)]
+BENCH_STUDY_TIME = 40
+BENCH_INITIAL_MOTIVATION = 3.0
+CHART_LANGS = ("zh", "en")
+
+# 每个样本至少运行这么久（不足时一个样本内重复多次取平均），降低计时器误差
+MIN_SAMPLE_SECONDS = 0.02
+REPEAT = 7
+
+# 回归判定：中位数变慢超过 REGRESSION_THRESHOLD，且单侧 Mann-Whitney 检验显著
+REGRESSION_THRESHOLD = 0.10
+REGRESSION_ALPHA = 0.05
+
+# 等价性判定（逐周双单侧检验）：|差值| + z·标准误 不超过 EQUIVALENCE_MARGIN；
+# 每周都须通过（交并检验），无需多重比较校正。1000 人时两次独立模拟的标准误约 0.025
+EQUIVALENCE_MARGIN = 0.1
+EQUIVALENCE_ALPHA = 0.05
+
+
+# 模拟引擎：返回 (每周平均动机, 每周标准差, 人数)；解析引擎没有抽样误差，标准差为 None
+def _simulate_numpy(study_time, genderdif, num_students, weeks, seed):
+    stats = simulate_motivation(
+        study_time, genderdif, BENCH_INITIAL_MOTIVATION, num_students=num_students, weeks=weeks,
+        burnout_threshold=BURNOUT_THRESHOLD, seed=seed, backend="numpy",
+    ).stats
+    return stats.mean, stats.std, stats.count
+
+
+def _simulate_numba(study_time, genderdif, num_students, weeks, seed):
+    stats = simulate_motivation(
+        study_time, genderdif, BENCH_INITIAL_MOTIVATION, num_students=num_students, weeks=weeks,
+        burnout_threshold=BURNOUT_THRESHOLD, seed=seed, backend="numba",
+    ).stats
+    return stats.mean, stats.std, stats.count
+
+
+def _simulate_analytic(study_time, genderdif, num_students, weeks, seed):
+    result = analytic_motivation(
+        study_time, genderdif, BENCH_INITIAL_MOTIVATION, weeks, BURNOUT_THRESHOLD
+    )
+    return result.mean, None, None
+
+
+ENGINES = {
+    "numpy": _simulate_numpy,
+    "numba": _simulate_numba,
+    "analytic": _simulate_analytic,
+}
+
+
+# 计时：先预热一次，每个样本按 MIN_SAMPLE_SECONDS 自动确定内部重复次数；返回每次调用的秒数
+def measure(fn, repeat=REPEAT):
+    fn()
+    number = 1
+    while True:
+        begin = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - begin
+        if elapsed >= MIN_SAMPLE_SECONDS:
+            break
+        number *= 2
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        begin = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - begin) / number)
+    return samples
+
+
+def _timing(samples):
+    return {"median": float(np.median(samples)), "min": float(np.min(samples)), "samples": samples}
+
+
+def bench_simulation(engine, sizes, seed, repeat, timings, curves):
+    simulate = ENGINES[engine]
+    for num_students, weeks in sizes:
+        for gender, genderdif in GENDER_COEFFICIENTS.items():
+            case = f"n={num_students}/weeks={weeks}/{gender}"
+            args = (BENCH_STUDY_TIME, genderdif, num_students, weeks, seed)
+            timings[f"simulation/{case}"] = _timing(measure(lambda: simulate(*args), repeat))
+            mean, std, count = simulate(*args)
+            curves[case] = {
+                "mean": np.asarray(mean).tolist(),
+                "std": None if std is None else np.asarray(std).tolist(),
+                "count": count,
+            }
+
+
+# 绘图各阶段分别计时：图表模板构建（含 tight_layout）、单独的 tight_layout、更新曲线与图例、
+# 栅格化绘制、PNG压缩（对已绘制的像素缓冲编码），以及完整的 savefig
+def bench_charts(langs, repeat, timings):
+    avg_motivations = _simulate_numpy(
+        BENCH_STUDY_TIME, GENDER_COEFFICIENTS["female"], NUM_STUDENTS, WEEKS, DEFAULT_SEED
+    )[0]
+    for lang in langs:
+        # 图表文字取自网页的语言词典
+        labels = lang_dict[lang]
+
+        def build():
+            return charts.ChartTemplate(
+                labels, lang, WEEKS, BURNOUT_THRESHOLD, charts.FIGURE_SIZE, charts.FIGURE_DPI
+            )
+
+        template = build()
+        template._update(avg_motivations, BENCH_STUDY_TIME, labels["gender_text_female"], None)
+        # 模板的 Figure 没有绑定画布（savefig 时临时使用 Agg），单独计时绘制需显式绑定
+        canvas = FigureCanvasAgg(template.fig)
+        canvas.draw()
+
+        def encode():
+            matplotlib.image.imsave(
+                io.BytesIO(), np.asarray(canvas.buffer_rgba()), format="png", dpi=charts.FIGURE_DPI
+            )
+
+        stages = {
+            "figure": build,
+            "tight_layout": template.fig.tight_layout,
+            "update": lambda: template._update(
+                avg_motivations, BENCH_STUDY_TIME, labels["gender_text_female"], None
+            ),
+            "draw": canvas.draw,
+            "png_encode": encode,
+            "savefig": lambda: template.render(
+                avg_motivations, BENCH_STUDY_TIME, labels["gender_text_female"]
+            ),
+        }
+        for stage, fn in stages.items():
+            timings[f"chart/{lang}/{stage}"] = _timing(measure(fn, repeat))
+
+
+def run(engine="numpy", suite="all", quick=False, seed=DEFAULT_SEED, repeat=REPEAT):
+    timings, curves = {}, {}
+    if suite in ("all", "simulation"):
+        if engine == "numba":
+            warm_up_backend("numba")
+        bench_simulation(engine, QUICK_SIMULATION_SIZES if quick else SIMULATION_SIZES,
+                         seed, repeat, timings, curves)
+    if suite in ("all", "chart"):
+        bench_charts(CHART_LANGS, repeat, timings)
+    return {
+        "meta": {
+            "engine": engine if engine != "numba" else resolve_backend("numba"),
+            "seed": seed,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "matplotlib": matplotlib.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+        },
+        "timings": timings,
+        "curves": curves,
+    }
+
+
+# 对比耗时：返回 [(键, 基线中位数, 新中位数, 比值, 状态)]，状态为 ok / faster / REGRESSION
+def compare_timings(baseline, candidate, threshold=REGRESSION_THRESHOLD, alpha=REGRESSION_ALPHA):
+    rows = []
+    for key in sorted(baseline.keys() & candidate.keys()):
+        base, new = baseline[key], candidate[key]
+        ratio = new["median"] / base["median"]
+        status = "ok"
+        if ratio > 1 + threshold:
+            if mannwhitneyu(new["samples"], base["samples"], alternative="greater").pvalue < alpha:
+                status = "REGRESSION"
+        elif ratio < 1 - threshold:
+            status = "faster"
+        rows.append((key, base["median"], new["median"], ratio, status))
+    return rows
+
+
+# 逐周双单侧等价检验：返回 (最大 |差值| + z·标准误, 是否等价)
+def curve_equivalence(base, new, margin=EQUIVALENCE_MARGIN, alpha=EQUIVALENCE_ALPHA):
+    diff = np.asarray(new["mean"]) - np.asarray(base["mean"])
+    variance = np.zeros_like(diff)
+    for curve in (base, new):
+        if curve["std"] is not None:
+            variance += np.asarray(curve["std"]) ** 2 / curve["count"]
+    bound = float(np.max(np.abs(diff) + norm.ppf(1 - alpha) * np.sqrt(variance)))
+    return bound, bound <= margin
+
+
+def compare(baseline, candidate, threshold=REGRESSION_THRESHOLD, margin=EQUIVALENCE_MARGIN,
+            out=sys.stdout):
+    ok = True
+    print(f"baseline:  {baseline['meta']['engine']} {baseline['meta']['created']}", file=out)
+    print(f"candidate: {candidate['meta']['engine']} {candidate['meta']['created']}", file=out)
+    for field in ("machine", "processor", "cpu_count", "python"):
+        if baseline["meta"].get(field) != candidate["meta"].get(field):
+            print(f"warning: {field} differs, timings are not directly comparable", file=out)
+
+    for key, base, new, ratio, status in compare_timings(
+            baseline["timings"], candidate["timings"], threshold):
+        print(f"{key:<40} {base * 1e3:>10.3f} ms {new * 1e3:>10.3f} ms {ratio:>6.2f}x  {status}",
+              file=out)
+        ok &= status != "REGRESSION"
+
+    for key in sorted(baseline["curves"].keys() & candidate["curves"].keys()):
+        bound, equivalent = curve_equivalence(baseline["curves"][key], candidate["curves"][key], margin)
+        print(f"curve {key:<34} bound {bound:.4f} (margin {margin})  "
+              f"{'equivalent' if equivalent else 'NOT EQUIVALENT'}", file=out)
+        ok &= equivalent
+
+    missing = (baseline["timings"].keys() ^ candidate["timings"].keys()) | (
+        baseline["curves"].keys() ^ candidate["curves"].keys())
+    if missing:
+        print(f"not compared (present in only one file): {', '.join(sorted(missing))}", file=out)
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the simulation and chart paths, and compare against stored baselines."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and write a JSON baseline")
+    run_parser.add_argument("-o", "--output", default=None,
+                            help="output path (default: benchmarks/<engine>.json)")
+    run_parser.add_argument("--engine", choices=sorted(ENGINES), default="numpy")
+    run_parser.add_argument("--suite", choices=["all", "simulation", "chart"], default="all")
+    run_parser.add_argument("--quick", action="store_true", help="only the default simulation size")
+    run_parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    run_parser.add_argument("--repeat", type=int, default=REPEAT)
+
+    compare_parser = commands.add_parser(
+        "compare", help="flag timing regressions and non-equivalent curves; exit 1 on failure"
+    )
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    compare_parser.add_argument("--margin", type=float, default=EQUIVALENCE_MARGIN)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        result = run(args.engine, args.suite, args.quick, args.seed, args.repeat)
+        path = args.output or os.path.join(BENCH_DIR, f"{args.engine}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=1)
+        print(f"wrote {path}")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)
+    return 0 if compare(baseline, candidate, args.threshold, args.margin) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+import collections
+import hashlib
+import io
+import os
+import threading
+
+import matplotlib
+
+# 服务器无图形界面，启动时固定使用 Agg 后端
+matplotlib.use("Agg")
+
+import matplotlib.font_manager as fm
+import numpy as np
+from matplotlib.figure import Figure
+
+import metrics
+import result_store
+from metrics import span
+from simulation import BURNOUT_THRESHOLD, find_critical_week
+
+FIGURE_SIZE = (10, 6)
+FIGURE_DPI = 100
+
+# 已编码PNG的缓存：按（结果哈希, 语言, 尺寸）索引，相同结果不重复编码
+PNG_CACHE_SIZE = int(os.environ.get("BURNOUT_PNG_CACHE_SIZE", "128"))
+
+# 动机区域：(下界, 上界, 颜色, 标签键)
+MOTIVATION_ZONES = (
+    (0, 1.0, 'red', "chart_region_burnout"),
+    (1.0, 2.5, 'orange', "chart_region_low"),
+    (2.5, 5.0, 'green', "chart_region_high"),
+)
+Y_LIMIT = 5
+
+FALLBACK_ZH_FAMILIES = ["WenQuanYi Micro Hei", "Heiti TC", "sans-serif"]
+EN_FAMILIES = ["Arial", "sans-serif"]
+
+# 刻度标签不使用 Unicode 负号，避免中文字体缺字；全局只设置一次
+matplotlib.rcParams["axes.unicode_minus"] = False
+
+
+# 中文：尝试加载SimHei字体，失败时使用备选字体
+def _resolve_zh_families():
+    font_path = os.path.join(os.path.dirname(__file__), "fonts", "simhei.ttf")
+    if os.path.exists(font_path):
+        try:
+            fm.fontManager.addfont(font_path)
+            return [fm.FontProperties(fname=font_path).get_name()] + FALLBACK_ZH_FAMILIES
+        except (OSError, RuntimeError):
+            pass
+    return FALLBACK_ZH_FAMILIES
+
+
+# 字体配置在导入时按语言解析一次，不修改全局 rcParams，可被并发会话安全共享
+FONT_FAMILIES = {
+    "zh": _resolve_zh_families(),
+    # 英文：使用默认字体
+    "en": EN_FAMILIES,
+}
+
+
+def font_families(lang):
+    return FONT_FAMILIES.get(lang, EN_FAMILIES)
+
+
+# 每种语言的静态图表部分（区域背景、阈值线、网格、坐标轴标签）只构建一次，
+# 每次渲染只更新曲线、交点标注、标题和图例
+class ChartTemplate:
+    def __init__(self, labels, lang, weeks, burnout_threshold, figsize, dpi):
+        self.labels = labels
+        self.burnout_threshold = burnout_threshold
+        self.family = font_families(lang)
+
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        ax = self.ax = self.fig.add_subplot()
+        x = range(1, weeks+1)
+
+        # 平均动机曲线及其置信带（仅自适应模式提供）
+        self.curve, = ax.plot([], [], '-', linewidth=2.5, color='blue')
+        self.band = ax.fill_between([], [], [], color='blue', alpha=0.2, linewidth=0)
+
+        # 与厌学阈值的交点
+        self.cross_marker = ax.scatter(
+            [burnout_threshold], [burnout_threshold],
+            color='red', s=100,
+            edgecolor='black', linewidth=1.5, zorder=5
+        )
+        self.cross_label = ax.annotate(
+            "",
+            xy=(1, burnout_threshold), xytext=(5, 10), textcoords='offset points',
+            fontsize=10,
+            bbox=dict(boxstyle="round,pad=0.3", fc="white", ec='red', alpha=0.8),
+            fontfamily=self.family
+        )
+
+        # 厌学阈值线
+        ax.axhline(
+            y=burnout_threshold,
+            color='r', linestyle='--', linewidth=1.5,
+            label=labels["chart_legend_burnout"]
+        )
+
+        # 动机区域背景色
+        for lower, upper, color, label_key in MOTIVATION_ZONES:
+            ax.fill_between(
+                x, lower, upper,
+                color=color, alpha=0.1,
+                label=labels[label_key]
+            )
+
+        # 图表属性
+        self.title = ax.set_title(labels["chart_title"], fontfamily=self.family, fontsize=14)
+        ax.set_xlabel(labels["chart_xlabel"], fontfamily=self.family, fontsize=12)
+        ax.set_ylabel(labels["chart_ylabel"], fontfamily=self.family, fontsize=12)
+        ax.tick_params(labelfontfamily=self.family)
+        ax.grid(True, linestyle='--', alpha=0.7)
+        ax.set_xlim(1, weeks)
+        ax.set_ylim(0, Y_LIMIT)
+        with span("tight_layout"):
+            self.fig.tight_layout()
+
+    def render(self, avg_motivations, study_time, gender_text, band=None):
+        with span("chart_update"):
+            self._update(avg_motivations, study_time, gender_text, band)
+
+        # savefig 包含栅格化绘制与PNG压缩
+        with span("png_encode"):
+            buffer = io.BytesIO()
+            self.fig.savefig(buffer, format="png")
+        return buffer.getvalue()
+
+    def _update(self, avg_motivations, study_time, gender_text, band):
+        labels = self.labels
+        # 流式模拟时曲线可能只覆盖前若干周
+        x = range(1, len(avg_motivations)+1)
+        self.curve.set_data(x, avg_motivations)
+        self.curve.set_label(labels["chart_legend_study_time"].format(study_time=study_time))
+
+        if band is not None:
+            self.band.set_data(x, band[0], band[1])
+        self.band.set_visible(band is not None)
+        self.band.set_label(labels["chart_legend_ci"] if band is not None else "_nolegend_")
+
+        critical_week = find_critical_week(avg_motivations, self.burnout_threshold)
+        if critical_week:
+            cross_point = (critical_week, self.burnout_threshold)
+            self.cross_marker.set_offsets([cross_point])
+            self.cross_label.xy = cross_point
+            self.cross_label.set_text(labels["chart_annotation_burnout"].format(week=critical_week))
+        self.cross_marker.set_visible(bool(critical_week))
+        self.cross_label.set_visible(bool(critical_week))
+
+        self.title.set_text(f'{gender_text} {labels["chart_title"]}')
+        self.ax.legend(prop={"family": self.family})
+
+
+# 模板按线程保存：Figure 不能被多个线程同时绘制
+_templates = threading.local()
+
+_png_cache = collections.OrderedDict()
+_png_cache_lock = threading.Lock()
+
+
+def _template(labels, lang, weeks, burnout_threshold, figsize, dpi):
+    if not hasattr(_templates, "by_key"):
+        _templates.by_key = {}
+    key = (lang, weeks, burnout_threshold, figsize, dpi)
+    template = _templates.by_key.get(key)
+    if template is None:
+        # 每个线程每种配置只构建一次；耗时包含其中的 tight_layout
+        with span("figure"):
+            template = _templates.by_key[key] = ChartTemplate(
+                labels, lang, weeks, burnout_threshold, figsize, dpi
+            )
+    return template
+
+
+def _result_digest(avg_motivations, study_time, gender_text, burnout_threshold, band):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(avg_motivations, dtype=float).tobytes())
+    if band is not None:
+        digest.update(np.ascontiguousarray(band, dtype=float).tobytes())
+    digest.update(repr((study_time, gender_text, burnout_threshold)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+# 绘制动机趋势图并编码为PNG；可在工作线程中调用。weeks 为横轴总周数，默认等于曲线长度；
+# band 为平均曲线置信带的 (下界, 上界)
+def render_motivation_chart(avg_motivations, study_time, gender_text, labels, lang,
+                            burnout_threshold=BURNOUT_THRESHOLD,
+                            figsize=FIGURE_SIZE, dpi=FIGURE_DPI, weeks=None, band=None):
+    weeks = weeks or len(avg_motivations)
+    key = (_result_digest(avg_motivations, study_time, gender_text, burnout_threshold, band),
+           lang, weeks, tuple(figsize), dpi)
+    with _png_cache_lock:
+        png = _png_cache.get(key)
+        if png is not None:
+            _png_cache.move_to_end(key)
+            metrics.inc("png_cache_hits_total")
+            return png
+
+    # 其他工作进程已绘制过的图直接取用；绘图耗时短，不登记在途计算
+    store = result_store.shared_store()
+    store_key = result_store.store_key(("png",) + key)
+    png = store.get_bytes(store_key) if store is not None else None
+    if png is None:
+        metrics.inc("png_cache_misses_total")
+        template = _template(labels, lang, weeks, burnout_threshold, tuple(figsize), dpi)
+        png = template.render(avg_motivations, study_time, gender_text, band)
+        if store is not None:
+            store.put_bytes(store_key, png)
+    else:
+        metrics.inc("png_cache_hits_total")
+
+    with _png_cache_lock:
+        _png_cache[key] = png
+        while len(_png_cache) > PNG_CACHE_SIZE:
+            _png_cache.popitem(last=False)
+    return png
+
+
+# 客户端绘图模式的数据：只包含曲线、交点、区域边界和文字，浏览器端据此绘图
+def chart_payload(avg_motivations, study_time, gender_text, labels,
+                  burnout_threshold=BURNOUT_THRESHOLD, weeks=None, band=None):
+    critical_week = find_critical_week(avg_motivations, burnout_threshold)
+    return {
+        "weeks": weeks or len(avg_motivations),
+        "curve": np.round(avg_motivations, 3).tolist(),
+        "band": np.round(band, 3).tolist() if band is not None else None,
+        "threshold": burnout_threshold,
+        "cross": [critical_week, burnout_threshold] if critical_week else None,
+        "zones": [[lower, upper, color] for lower, upper, color, _ in MOTIVATION_ZONES],
+        "y_max": Y_LIMIT,
+        "text": {
+            "title": f'{gender_text} {labels["chart_title"]}',
+            "x": labels["chart_xlabel"],
+            "y": labels["chart_ylabel"],
+            "legend": [labels["chart_legend_study_time"].format(study_time=study_time)]
+                      + ([labels["chart_legend_ci"]] if band is not None else [])
+                      + [labels["chart_legend_burnout"]]
+                      + [labels[label_key] for _, _, _, label_key in MOTIVATION_ZONES],
+            "cross": (labels["chart_annotation_burnout"].format(week=critical_week)
+                      if critical_week else None),
+        },
+    }
+
+
+# 启动预热：为每种语言查找字体并完整绘制一次，填充 matplotlib 的字体和文字排版缓存
+def warm_up(labels_by_lang):
+    for lang, labels in labels_by_lang.items():
+        fm.findfont(fm.FontProperties(family=font_families(lang)))
+        template = ChartTemplate(labels, lang, 2, BURNOUT_THRESHOLD, FIGURE_SIZE, FIGURE_DPI)
+        template.render(np.array([1.5, 0.5]), 0, "")
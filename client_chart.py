@@ -0,0 +1,31 @@
+from pathlib import Path
+
+from htmltools import HTMLDependency
+from shiny import ui
+from shiny.render.renderer import Renderer
+
+# 浏览器端绘图组件：只接收曲线数据，由 www/motivation_chart.js 绘制 SVG
+motivation_chart_dependency = HTMLDependency(
+    "motivation-chart",
+    "1.0.0",
+    source={"subdir": str(Path(__file__).parent / "www")},
+    script={"src": "motivation_chart.js"},
+)
+
+
+def output_motivation_chart(id, height="500px"):
+    return ui.div(
+        motivation_chart_dependency,
+        id=id,
+        class_="motivation-chart-output",
+        style=f"width: 100%; height: {height};",
+    )
+
+
+# 渲染函数返回 charts.chart_payload 生成的字典，原样以JSON发送
+class render_motivation_chart_data(Renderer[dict]):
+    def auto_output_ui(self):
+        return output_motivation_chart(self.output_id)
+
+    async def transform(self, value: dict):
+        return value
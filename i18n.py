@@ -0,0 +1,33 @@
+import re
+from pathlib import Path
+
+from htmltools import HTMLDependency
+from shiny import ui
+
+# 切换语言时只替换文字、不重建页面：可翻译的文字渲染为带 data-i18n 键的 span，
+# 由 www/i18n.js 收到消息后按键替换，输入框中已填写的内容保持不变
+i18n_dependency = HTMLDependency(
+    "burnout-i18n",
+    "1.0.0",
+    source={"subdir": str(Path(__file__).parent / "www")},
+    script={"src": "i18n.js"},
+)
+
+I18N_MESSAGE = "burnout-i18n"
+
+
+def i18n_text(labels, key):
+    return ui.span(labels[key], {"data-i18n": key})
+
+
+# 页面中用到的全部文字键
+def i18n_keys(page):
+    return sorted(set(re.findall(r'data-i18n="([^"]+)"', str(page))))
+
+
+# 每种语言的文字更新消息：启动时按页面实际用到的键生成一次，会话中直接发送
+def i18n_messages(labels_by_lang, keys):
+    return {
+        lang: {"lang": lang, "texts": {key: labels[key] for key in keys}}
+        for lang, labels in labels_by_lang.items()
+    }
@@ -0,0 +1,131 @@
+# 中英双语词典
+lang_dict = {
+    "zh": {
+        "page_title": "*学习倦怠/厌学*关键期计算模拟",
+        "language_select": "请选择语言 / Pls Select Language",
+        "classes_question_num": "1.",
+        "classes_question_text": "您个人每周的学习时长是多少课时？/您班级或学校每周人均学习时长是多少课时？（含自习课、作业；一课时=40/45分钟）",
+        "classes_hint": "提示：请输入0-100之间的整数，超过100将自动按100处理",
+        "gender_question_num": "2.",
+        "gender_question_text": "请选择性别？",
+        "gender_male": "男",
+        "gender_female": "女",
+        "gender_other": "为班级/学校做计算、无性别",
+        "motivation_question_num": "3. ",
+        "motivation_question_text": "请输入您个人/您班级学生/您学校学生的初始学习动机值（1-4分之间，可以有小数点）",
+        "motivation_ref_method": "测试参考（也可自行选用量表）：",
+        "motivation_step1": "1. 先完成以下3道自测题，每题选择对应选项；",
+        "motivation_step2": "2. 计算3道题的平均分作为初始动机值填入上方输入框。(精确到0.1)",
+        "motivation_self1": "问题1：在学校我感到自己进发出能量",
+        "motivation_self2": "问题2：我觉得我的学习目标明确，且很有意义",
+        "motivation_self3": "问题3：当我学习时，时间总是过得飞快",
+        "score_1": "1分 - 没有",
+        "score_2": "2分 - 有一点",
+        "score_3": "3分 - 还不错",
+        "score_4": "4分 - 经常",
+        "motivation_formula_title": "平均分计算公式：",
+        "motivation_formula": "初始动机值 = （问题1得分 + 问题2得分 + 问题3得分） ÷ 3",
+        "motivation_example": "例如：若3道题得分分别为3分、4分、3分，则初始动机值 = （3+4+3）÷3 ≈ 3.3分",
+        "question_source_title": "问题来源参考文献：",
+        "question_source": "Teuber, Z., Tang, X., Salmela-Aro, K., & Wild, E. (2021). Assessing engagement in Chinese upper secondary school students using the Chinese version of the schoolwork engagement inventory: energy, dedication, and absorption (CEDA). Frontiers in Psychology, 12, 638189.",
+        "submit_btn": "计算评价结果",
+        "reset_btn": "重新评价",
+        "complete_all_hint": "请完成所有问题后再提交",
+        "share_link": "分享链接（随机种子 {seed}，打开后复现同一曲线）",
+        "motivation_input_hint": "请根据以下参考问题和计算方法，输入您的初始学习动机值",
+        "result_title": "您的评价结果",
+        "motivation_start_point": "动机起始点: ",
+        "chart_title": "学习动机趋势预测",
+        "chart_xlabel": "周数",
+        "chart_ylabel": "平均学习动机水平",
+        "chart_legend_study_time": "{study_time}课时/周",
+        "chart_legend_burnout": "厌学阈值",
+        "chart_legend_ci": "95%置信区间",
+        "chart_annotation_burnout": "第{week}周达到厌学阈值",
+        "chart_region_burnout": "厌学区域",
+        "chart_region_low": "低动机区域",
+        "chart_region_high": "高动机区域",
+        "gender_text_male": "男性",
+        "gender_text_female": "女性",
+        "gender_text_other": "整体",
+        "roster_title": "或上传学生名单，逐个学生模拟",
+        "roster_hint": "CSV 或 Parquet 文件，每行一名学生。列：class_count（每周课时）、gender（male/female/other，可省略）、initial_motivation（1-4），可选 group（班级等分组）",
+        "roster_submit_btn": "按名单计算",
+        "roster_missing": "请先上传名单文件",
+        "roster_error": "名单文件有误：{error}",
+        "roster_summary_title": "全体与各分组结果",
+        "roster_cohort": "全体学生",
+        "roster_col_group": "分组",
+        "roster_col_students": "人数",
+        "roster_col_study_time": "平均课时/周",
+        "roster_col_initial_motivation": "平均初始动机",
+        "roster_col_critical_week": "关键周",
+        "roster_col_final_motivation": "最终平均动机",
+        "roster_col_burnout": "最终厌学比例",
+        "roster_not_reached": "未达到"
+    },
+    "en": {
+        "page_title": "*Academic Burnout* Critical Week Computation",
+        "language_select": "Pls Select Language / 选择语言",
+        "classes_question_num": "1.",
+        "classes_question_text": "What is your weekly study hours in term of class hours/What is the average weekly study hours of your class or school (including self-study, homework; 1 class hour = 40/45 minutes)?",
+        "classes_hint": "Hint: Please enter an integer between 0-100; values over 100 will be treated as 100",
+        "gender_question_num": "2.",
+        "gender_question_text": "Pls select the gender?",
+        "gender_male": "Male",
+        "gender_female": "Female",
+        "gender_other": "For class/school calculation (no gender) or Not applicable above",
+        "motivation_question_num": "3. ",
+        "motivation_question_text": "Please enter your/ your group's initial learning motivation score (within 1-4 points, decimal is allowed)",
+        "motivation_ref_method": "Illustrative questions (Other tests are also welcomed):",
+        "motivation_step1": "1. First complete the following 3 self-assessment questions and select the corresponding option for each;",
+        "motivation_step2": "2. Calculate the average score of the 3 questions and enter it as the initial motivation value above (accurate to 0.1).",
+        "motivation_self1": "Question 1: At school I am bursting with energy",
+        "motivation_self2": "Question 2: I find the schoolwork full of meaning and purpose",
+        "motivation_self3": "Question 3: Time flies when I am studying",
+        "score_1": "1 point - Not at all",
+        "score_2": "2 points - Slightly",
+        "score_3": "3 points - Moderately",
+        "score_4": "4 points - Always",
+        "motivation_formula_title": "Average Score Calculation Formula:",
+        "motivation_formula": "Initial Motivation = (Score of Q1 + Score of Q2 + Score of Q3) ÷ 3",
+        "motivation_example": "Example: If scores are 3, 4, 3, then Initial Motivation = (3+4+3) ÷3 ≈ 3.3 points",
+        "question_source": "Teuber, Z., Tang, X., Salmela-Aro, K., & Wild, E. (2021). Assessing engagement in Chinese upper secondary school students using the Chinese version of the schoolwork engagement inventory: energy, dedication, and absorption (CEDA). Frontiers in Psychology, 12, 638189.",
+        "question_source_title": "References for the sample questions:",
+        "submit_btn": "Calculate Evaluation Result",
+        "reset_btn": "Re-evaluate",
+        "complete_all_hint": "Please complete all questions before submitting",
+        "share_link": "Share link (seed {seed}; opens this exact curve)",
+        "motivation_input_hint": "Please enter your initial learning motivation based on the reference questions and calculation method below",
+        "result_title": "Your Evaluation Result",
+        "motivation_start_point": "Motivation Starting Point: ",
+        "chart_title": "Learning Motivation Trend Prediction",
+        "chart_xlabel": "Weeks",
+        "chart_ylabel": "Average Learning Motivation Level",
+        "chart_legend_study_time": "{study_time} Class Hours/Week",
+        "chart_legend_burnout": "Burnout Threshold",
+        "chart_legend_ci": "95% Confidence Interval",
+        "chart_annotation_burnout": "Reaches Burnout Threshold at Week {week}",
+        "chart_region_burnout": "Burnout Zone",
+        "chart_region_low": "Low Motivation Zone",
+        "chart_region_high": "High Motivation Zone",
+        "gender_text_male": "Male",
+        "gender_text_female": "Female",
+        "gender_text_other": "Overall",
+        "roster_title": "Or upload a student roster to simulate each student individually",
+        "roster_hint": "CSV or Parquet file, one student per row. Columns: class_count (class hours per week), gender (male/female/other, optional), initial_motivation (1-4), and an optional group (e.g. class)",
+        "roster_submit_btn": "Calculate for Roster",
+        "roster_missing": "Please upload a roster file first",
+        "roster_error": "Invalid roster file: {error}",
+        "roster_summary_title": "Results for the Cohort and Each Subgroup",
+        "roster_cohort": "Whole cohort",
+        "roster_col_group": "Subgroup",
+        "roster_col_students": "Students",
+        "roster_col_study_time": "Mean Class Hours/Week",
+        "roster_col_initial_motivation": "Mean Initial Motivation",
+        "roster_col_critical_week": "Critical Week",
+        "roster_col_final_motivation": "Final Mean Motivation",
+        "roster_col_burnout": "Final Burnout Fraction",
+        "roster_not_reached": "Not reached"
+    }
+}
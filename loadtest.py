@@ -0,0 +1,308 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.parse
+import urllib.request
+
+import numpy as np
+import websockets
+
+from simulation import GENDER_COEFFICIENTS, MAX_STUDY_TIME
+
+# 多会话压测：在本地用 uvicorn 启动 app.py（或连接已运行的服务），N 个并发 websocket 会话
+# 按真实的输入流程操作：填写表单并提交、等待图表，按概率切换语言、断开重连。
+# 报告出图耗时的 p50/p95/p99、吞吐量，并定期抓取 /metrics 记录进程内存与请求延迟
+# （/metrics 与 Shiny 共用事件循环，其延迟升高说明事件循环被阻塞）
+DEFAULT_PORT = 8765
+STARTUP_TIMEOUT = 120
+CHART_OUTPUT = "motivation_agent"
+SAMPLE_INTERVAL = 1.0
+
+
+# 启动服务：额外的环境变量（如 BURNOUT_SIM_MODE）只传给服务进程
+def start_server(port, env):
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env={**os.environ, **env},
+    )
+
+
+def http_get(url, timeout=10):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.status, response.read().decode("utf-8")
+
+
+def wait_ready(base_url, server=None, timeout=STARTUP_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server is not None and server.poll() is not None:
+            raise RuntimeError(f"server exited with code {server.returncode}")
+        try:
+            if http_get(base_url + "/healthz")[0] == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"server not ready after {timeout} s")
+
+
+def parse_metrics(text):
+    values = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            values[name] = float(value)
+    return values
+
+
+# Shiny 会话：init 时提交客户端数据；所有输出视为可见，隐藏的结果页同样会计算
+class ShinySession:
+    def __init__(self, ws_url, port):
+        self.ws_url = ws_url
+        self.port = port
+        self.ws = None
+
+    async def connect(self, lang):
+        self.ws = await websockets.connect(self.ws_url, max_size=None)
+        await self.ws.recv()
+        clientdata = {
+            ".clientdata_url_search": "", ".clientdata_url_pathname": "/",
+            ".clientdata_url_hostname": "127.0.0.1", ".clientdata_url_protocol": "http:",
+            ".clientdata_url_port": str(self.port), ".clientdata_url_hash": "",
+            ".clientdata_url_hash_initial": "", ".clientdata_pixelratio": 1,
+            ".clientdata_singletons": "",
+            f".clientdata_output_{CHART_OUTPUT}_hidden": False,
+            ".clientdata_output_avg_score_hidden": False,
+            ".clientdata_output_share_link_hidden": False,
+        }
+        await self.send("init", {"lang": lang, **clientdata})
+        while "values" not in await self.receive():
+            pass
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+            self.ws = None
+
+    async def send(self, method, data):
+        await self.ws.send(json.dumps({"method": method, "data": data}))
+
+    async def receive(self):
+        return json.loads(await self.ws.recv())
+
+    # 等待图表输出的新值（Shiny 在每轮刷新的 busy/idle 之后才发送输出值，空值表示输出被清空）；
+    # 输出出错时抛出 RuntimeError
+    async def wait_chart(self):
+        while True:
+            message = await self.receive()
+            if CHART_OUTPUT in message.get("errors", {}):
+                raise RuntimeError(message["errors"][CHART_OUTPUT].get("message", "output error"))
+            if message.get("values", {}).get(CHART_OUTPUT) is not None:
+                return time.perf_counter()
+
+
+class LoadResults:
+    def __init__(self):
+        self.latencies = {"connect": [], "submit": [], "language": []}
+        self.errors = []
+        self.samples = []
+
+    def record(self, kind, seconds):
+        self.latencies[kind].append(seconds)
+
+
+# 一个虚拟用户：连接后循环提交，直到结束时间
+async def run_user(index, args, results, stop_at):
+    rng = random.Random(args.seed * 100_003 + index)
+    await asyncio.sleep(args.ramp * index / max(1, args.sessions))
+    session = ShinySession(args.ws_url, args.port)
+    lang, submits = "zh", 0
+    try:
+        while time.monotonic() < stop_at:
+            try:
+                if session.ws is None:
+                    begin = time.perf_counter()
+                    await asyncio.wait_for(session.connect(lang), args.timeout)
+                    results.record("connect", time.perf_counter() - begin)
+                    submits = 0
+
+                # 输入取随机值，避免全部命中结果缓存；--repeat-inputs 时固定输入以测试缓存路径
+                if args.repeat_inputs:
+                    class_count, gender, initial_motivation = 40, "female", 3.0
+                else:
+                    class_count = rng.randint(0, MAX_STUDY_TIME)
+                    gender = rng.choice(list(GENDER_COEFFICIENTS))
+                    initial_motivation = round(rng.uniform(1, 4), 1)
+                await session.send("update", {
+                    "class_count": class_count, "gender": gender,
+                    "initial_motivation": initial_motivation,
+                })
+                submits += 1
+                begin = time.perf_counter()
+                await session.send("update", {"submit:shiny.action": submits})
+                results.record("submit", await asyncio.wait_for(session.wait_chart(), args.timeout) - begin)
+
+                if rng.random() < args.toggle_rate:
+                    lang = "en" if lang == "zh" else "zh"
+                    begin = time.perf_counter()
+                    await session.send("update", {"lang": lang})
+                    results.record("language", await asyncio.wait_for(session.wait_chart(), args.timeout) - begin)
+
+                if rng.random() < args.reconnect_rate:
+                    await session.close()
+            except (asyncio.TimeoutError, OSError, RuntimeError,
+                    websockets.exceptions.WebSocketException) as error:
+                results.errors.append(f"{type(error).__name__}: {error}")
+                await session.close()
+            await asyncio.sleep(rng.expovariate(1 / args.think) if args.think else 0)
+    finally:
+        await session.close()
+
+
+# 定期抓取 /metrics：记录内存、CPU与请求耗时（事件循环阻塞的近似）
+async def sample_metrics(base_url, results, stop_at, begin):
+    while time.monotonic() < stop_at:
+        request_begin = time.perf_counter()
+        try:
+            _, text = await asyncio.to_thread(http_get, base_url + "/metrics")
+        except OSError as error:
+            results.errors.append(f"metrics: {error}")
+        else:
+            values = parse_metrics(text)
+            results.samples.append({
+                "t": round(time.monotonic() - begin, 3),
+                "loop_latency": time.perf_counter() - request_begin,
+                "rss_bytes": values.get("process_resident_memory_bytes"),
+                "cpu_seconds": values.get("process_cpu_seconds_total"),
+                "active_sessions": values.get("burnout_active_sessions"),
+            })
+        await asyncio.sleep(SAMPLE_INTERVAL)
+
+
+def percentiles(values):
+    if not values:
+        return None
+    values = np.asarray(values)
+    return {
+        "count": int(values.size),
+        "p50": float(np.percentile(values, 50)),
+        "p95": float(np.percentile(values, 95)),
+        "p99": float(np.percentile(values, 99)),
+        "max": float(values.max()),
+    }
+
+
+def summarize(results, duration, args):
+    rss = [(s["t"], s["rss_bytes"]) for s in results.samples if s["rss_bytes"] is not None]
+    memory = None
+    if len(rss) >= 2:
+        t, values = np.array(rss).T
+        # 内存增长：对采样做线性回归，单位 MB/分钟
+        slope = np.polyfit(t, values, 1)[0] if np.ptp(t) > 0 else 0.0
+        memory = {
+            "start_mb": values[0] / 2**20, "end_mb": values[-1] / 2**20,
+            "max_mb": values.max() / 2**20, "growth_mb_per_min": slope * 60 / 2**20,
+        }
+    return {
+        "config": {key: value for key, value in vars(args).items() if key != "server_env"},
+        "server_env": args.server_env,
+        "duration_seconds": duration,
+        "charts": len(results.latencies["submit"]) + len(results.latencies["language"]),
+        "throughput_charts_per_second": (
+            (len(results.latencies["submit"]) + len(results.latencies["language"])) / duration
+        ),
+        "time_to_chart": {kind: percentiles(values) for kind, values in results.latencies.items()},
+        "loop_latency": percentiles([s["loop_latency"] for s in results.samples]),
+        "memory": memory,
+        "errors": len(results.errors),
+        "error_examples": sorted(set(results.errors))[:10],
+        "samples": results.samples,
+    }
+
+
+def print_summary(summary, out=sys.stdout):
+    print(f"duration {summary['duration_seconds']:.1f} s, charts {summary['charts']}, "
+          f"throughput {summary['throughput_charts_per_second']:.2f}/s, errors {summary['errors']}",
+          file=out)
+    rows = list(summary["time_to_chart"].items()) + [("/metrics latency", summary["loop_latency"])]
+    for kind, stats in rows:
+        if stats:
+            print(f"{kind:<18} n={stats['count']:<6} p50 {stats['p50'] * 1e3:8.1f} ms  "
+                  f"p95 {stats['p95'] * 1e3:8.1f} ms  p99 {stats['p99'] * 1e3:8.1f} ms  "
+                  f"max {stats['max'] * 1e3:8.1f} ms", file=out)
+    if summary["memory"]:
+        memory = summary["memory"]
+        print(f"rss {memory['start_mb']:.1f} -> {memory['end_mb']:.1f} MB (max {memory['max_mb']:.1f}), "
+              f"growth {memory['growth_mb_per_min']:+.2f} MB/min", file=out)
+    for example in summary["error_examples"]:
+        print(f"error: {example}", file=out)
+
+
+async def run_load(args):
+    begin = time.monotonic()
+    stop_at = begin + args.duration
+    results = LoadResults()
+    await asyncio.gather(
+        sample_metrics(args.base_url, results, stop_at, begin),
+        *(run_user(index, args, results, stop_at) for index in range(args.sessions)),
+    )
+    return summarize(results, time.monotonic() - begin, args)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Drive concurrent Shiny websocket sessions against the app and report "
+                    "time-to-chart percentiles, throughput and server memory."
+    )
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--ramp", type=float, default=5, help="seconds over which sessions start")
+    parser.add_argument("--think", type=float, default=1.0, help="mean pause between submits (s)")
+    parser.add_argument("--toggle-rate", type=float, default=0.2,
+                        help="probability of a language toggle after each chart")
+    parser.add_argument("--reconnect-rate", type=float, default=0.05,
+                        help="probability of dropping and reopening the session after each chart")
+    parser.add_argument("--repeat-inputs", action="store_true",
+                        help="submit the same inputs every time (cache path)")
+    parser.add_argument("--timeout", type=float, default=60, help="per-step timeout (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--url", default=None,
+                        help="use an already running server instead of starting one, "
+                             "e.g. http://127.0.0.1:8000")
+    parser.add_argument("--env", dest="server_env", action="append", default=[], metavar="KEY=VALUE",
+                        help="environment variable for the started server (repeatable)")
+    parser.add_argument("-o", "--output", default=None, help="write the full report as JSON")
+    args = parser.parse_args(argv)
+
+    args.base_url = (args.url or f"http://127.0.0.1:{args.port}").rstrip("/")
+    args.port = urllib.parse.urlsplit(args.base_url).port or 80
+    args.ws_url = args.base_url.replace("http", "ws", 1) + "/websocket/"
+
+    server = None
+    if args.url is None:
+        server = start_server(args.port, dict(item.split("=", 1) for item in args.server_env))
+    try:
+        wait_ready(args.base_url, server)
+        summary = asyncio.run(run_load(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    print_summary(summary)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=1)
+    return 0 if summary["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
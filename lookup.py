@@ -0,0 +1,143 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+from simulation import (
+    BURNOUT_THRESHOLD, DEFAULT_SEED, GENDER_COEFFICIENTS, MAX_STUDY_TIME, NUM_STUDENTS,
+    STREAM_BLOCK_SIZE, WEEKS, SWEEP_GENDERS, SWEEP_INITIAL_MOTIVATIONS, SWEEP_STUDY_TIMES,
+    cached_simulation, find_critical_week, gender_coefficient, resolve_backend,
+)
+
+# 预计算查找表：对全部输入网格（学习时长 × 性别 × 初始动机）离线计算平均动机曲线与关键周，
+# 以 .npy 保存，启动时内存映射加载；网格内的请求直接查表或插值，网格外回退到实时模拟
+LOOKUP_DIR = os.environ.get(
+    "BURNOUT_LOOKUP_DIR", os.path.join(os.path.dirname(__file__), "lookup")
+)
+CURVES_FILE = "curves.npy"
+CRITICAL_WEEKS_FILE = "critical_weeks.npy"
+META_FILE = "meta.json"
+
+
+# 查找表的生成参数；与当前模拟参数不一致的表视为过期，不予加载
+def table_meta(backend=None):
+    return {
+        "study_times": SWEEP_STUDY_TIMES.tolist(),
+        "genders": list(SWEEP_GENDERS),
+        "initial_motivations": SWEEP_INITIAL_MOTIVATIONS.tolist(),
+        "gender_coefficients": GENDER_COEFFICIENTS,
+        "num_students": NUM_STUDENTS,
+        "weeks": WEEKS,
+        "burnout_threshold": BURNOUT_THRESHOLD,
+        "seed": DEFAULT_SEED,
+        "bit_generator": "Philox",
+        "stream_block_size": STREAM_BLOCK_SIZE,
+        "backend": resolve_backend(backend),
+    }
+
+
+# 在工作进程中执行：计算某一学习时长下所有性别与初始动机的平均曲线；
+# 与网页使用相同的随机种子，网格点上的查表结果与实时模拟完全一致
+def _study_time_curves(study_time, backend=None):
+    curves = np.empty((len(SWEEP_GENDERS), SWEEP_INITIAL_MOTIVATIONS.size, WEEKS))
+    for j, gender in enumerate(SWEEP_GENDERS):
+        for k, initial_motivation in enumerate(SWEEP_INITIAL_MOTIVATIONS):
+            result = cached_simulation(
+                float(study_time), gender_coefficient(gender), float(initial_motivation),
+                seed=DEFAULT_SEED, num_students=NUM_STUDENTS, weeks=WEEKS,
+                burnout_threshold=BURNOUT_THRESHOLD, backend=backend,
+            )
+            curves[j, k] = result.stats.mean
+    return curves
+
+
+def build_lookup_table(directory=LOOKUP_DIR, workers=None, backend=None):
+    from batch import make_pool
+
+    os.makedirs(directory, exist_ok=True)
+    curves = np.empty((SWEEP_STUDY_TIMES.size, len(SWEEP_GENDERS),
+                       SWEEP_INITIAL_MOTIVATIONS.size, WEEKS))
+    with make_pool(workers or os.cpu_count() or 1) as pool:
+        backends = [backend] * SWEEP_STUDY_TIMES.size
+        for i, study_curves in enumerate(pool.map(_study_time_curves, SWEEP_STUDY_TIMES, backends)):
+            curves[i] = study_curves
+
+    critical_weeks = np.zeros(curves.shape[:3], dtype=np.int16)
+    for index in np.ndindex(critical_weeks.shape):
+        critical_weeks[index] = find_critical_week(curves[index], BURNOUT_THRESHOLD) or 0
+
+    # 先写临时文件再替换，运行中的服务不会读到写了一半的表
+    for name, array in ((CURVES_FILE, curves), (CRITICAL_WEEKS_FILE, critical_weeks)):
+        path = os.path.join(directory, name)
+        np.save(path + ".tmp.npy", array)
+        os.replace(path + ".tmp.npy", path)
+    with open(os.path.join(directory, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(table_meta(backend), f)
+
+
+# 在有序网格中定位：返回 (下标0, 下标1, 权重)；超出网格返回 None
+def _bracket(grid, value):
+    if not grid[0] - 1e-9 <= value <= grid[-1] + 1e-9:
+        return None
+    upper = int(np.clip(np.searchsorted(grid, value), 1, grid.size - 1))
+    lower = upper - 1
+    weight = (value - grid[lower]) / (grid[upper] - grid[lower])
+    if weight < 1e-9:
+        return lower, lower, 0.0
+    if weight > 1 - 1e-9:
+        return upper, upper, 0.0
+    return lower, upper, float(weight)
+
+
+class LookupTable:
+    def __init__(self, directory, meta):
+        self.meta = meta
+        self.study_times = np.asarray(meta["study_times"], dtype=float)
+        self.initial_motivations = np.asarray(meta["initial_motivations"], dtype=float)
+        self.gender_index = {gender: j for j, gender in enumerate(meta["genders"])}
+        self.curves = np.load(os.path.join(directory, CURVES_FILE), mmap_mode="r")
+        self.critical_weeks = np.load(os.path.join(directory, CRITICAL_WEEKS_FILE), mmap_mode="r")
+
+    # 返回 (平均动机曲线, 关键周)；网格点直接查表，网格之间按学习时长和初始动机双线性插值。
+    # 初始动机与实时模拟一样先保留一位小数；超出网格返回 None
+    def lookup(self, study_time, gender, initial_motivation):
+        j = self.gender_index.get(gender, self.gender_index.get("other"))
+        study = _bracket(self.study_times, min(MAX_STUDY_TIME, float(study_time)))
+        motivation = _bracket(self.initial_motivations, round(float(initial_motivation), 1))
+        if j is None or study is None or motivation is None:
+            return None
+
+        (i0, i1, wi), (k0, k1, wk) = study, motivation
+        if wi == 0 and wk == 0:
+            return np.array(self.curves[i0, j, k0]), int(self.critical_weeks[i0, j, k0]) or None
+        curve = ((1 - wi) * (1 - wk) * self.curves[i0, j, k0] + (1 - wi) * wk * self.curves[i0, j, k1]
+                 + wi * (1 - wk) * self.curves[i1, j, k0] + wi * wk * self.curves[i1, j, k1])
+        return curve, find_critical_week(curve, BURNOUT_THRESHOLD)
+
+
+# 启动时加载查找表；文件不存在或与当前参数不一致时返回 None（全部请求实时模拟）
+def load_lookup_table(directory=LOOKUP_DIR, backend=None):
+    try:
+        with open(os.path.join(directory, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta != json.loads(json.dumps(table_meta(backend))):
+            return None
+        return LookupTable(directory, meta)
+    except (OSError, ValueError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Precompute the mean motivation curve and critical week for the whole input grid."
+    )
+    parser.add_argument("-o", "--output", default=LOOKUP_DIR, help="output directory")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--backend", default=None, help="numpy or numba (default: BURNOUT_SIM_BACKEND)")
+    args = parser.parse_args(argv)
+    build_lookup_table(args.output, args.workers, args.backend)
+
+
+if __name__ == "__main__":
+    main()
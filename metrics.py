@@ -0,0 +1,195 @@
+import bisect
+import collections
+import contextlib
+import cProfile
+import itertools
+import os
+import threading
+import time
+
+import psutil
+
+# 进程内指标：各阶段耗时（直方图）、计数器与进程内存，以 Prometheus 文本格式在 /metrics 导出。
+# 只统计当前进程；批量计算的工作进程不在其中
+METRIC_PREFIX = "burnout"
+
+# 耗时直方图的桶上界（秒）
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 计数器与仪表的说明；未列出的名称同样可以使用
+COUNTER_HELP = {
+    "sessions_total": "Shiny sessions started.",
+    "submits_total": "Simulation requests from the form.",
+    "shared_links_total": "Simulation requests from share links.",
+    "roster_submits_total": "Roster uploads submitted for simulation.",
+    "language_switches_total": "Language toggles.",
+    "simulation_cache_hits_total": "Simulation requests answered from the in-process result LRU.",
+    "simulation_cache_misses_total": "Simulation requests not found in the in-process result LRU.",
+    "png_cache_hits_total": "Chart renders answered from the PNG cache.",
+    "png_cache_misses_total": "Chart renders that drew and encoded a new PNG.",
+    "result_store_hits_total": "Results found in the cross-process result store.",
+    "result_store_waits_total": "Results received after waiting for another worker computing them.",
+    "result_store_misses_total": "Results computed by this worker and written to the result store.",
+}
+GAUGE_HELP = {
+    "active_sessions": "Shiny sessions currently open.",
+    "simulation_cache_entries": "Results currently held in the in-process simulation LRU.",
+}
+
+# 按请求的 cProfile 分析：设置目录后每次模拟和绘图各写出一个 .prof 文件（python -m pstats 查看）
+PROFILE_DIR = os.environ.get("BURNOUT_PROFILE_DIR", "")
+
+_lock = threading.Lock()
+_counters = collections.Counter()
+_gauges = collections.Counter()
+# (阶段, 标签) -> [各桶计数, 总次数, 总耗时]
+_stages = {}
+_process = psutil.Process()
+# 自带计数的对象（如模拟结果缓存）登记的取值函数，导出时调用，返回 {名称: 值}
+_counter_sources = []
+_gauge_sources = []
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def inc(name, amount=1):
+    with _lock:
+        _counters[name] += amount
+
+
+def add_gauge(name, amount):
+    with _lock:
+        _gauges[name] += amount
+
+
+def register_counters(source):
+    _counter_sources.append(source)
+
+
+def register_gauges(source):
+    _gauge_sources.append(source)
+
+
+def observe(stage, seconds, **labels):
+    key = (stage, _label_key(labels))
+    with _lock:
+        entry = _stages.get(key)
+        if entry is None:
+            entry = _stages[key] = [[0] * len(STAGE_BUCKETS), 0, 0.0]
+        index = bisect.bisect_left(STAGE_BUCKETS, seconds)
+        if index < len(STAGE_BUCKETS):
+            entry[0][index] += 1
+        entry[1] += 1
+        entry[2] += seconds
+
+
+# 记录一个阶段的耗时；出错或被取消的阶段不计入
+@contextlib.contextmanager
+def span(stage, **labels):
+    begin = time.perf_counter()
+    yield
+    observe(stage, time.perf_counter() - begin, **labels)
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+def render_metrics():
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        stages = {key: (list(buckets), count, total) for key, (buckets, count, total) in _stages.items()}
+
+    for source in _counter_sources:
+        counters.update(source())
+    for source in _gauge_sources:
+        gauges.update(source())
+
+    lines = []
+    for name in COUNTER_HELP:
+        counters.setdefault(name, 0)
+    for name, value in sorted(counters.items()):
+        lines += [f"# HELP {METRIC_PREFIX}_{name} {COUNTER_HELP.get(name, name)}",
+                  f"# TYPE {METRIC_PREFIX}_{name} counter",
+                  f"{METRIC_PREFIX}_{name} {value}"]
+    for name in GAUGE_HELP:
+        gauges.setdefault(name, 0)
+    for name, value in sorted(gauges.items()):
+        lines += [f"# HELP {METRIC_PREFIX}_{name} {GAUGE_HELP.get(name, name)}",
+                  f"# TYPE {METRIC_PREFIX}_{name} gauge",
+                  f"{METRIC_PREFIX}_{name} {value}"]
+
+    name = f"{METRIC_PREFIX}_stage_seconds"
+    lines += [f"# HELP {name} Wall time of each request stage.", f"# TYPE {name} histogram"]
+    for (stage, labels), (buckets, count, total) in sorted(stages.items()):
+        pairs = (("stage", stage),) + labels
+        for upper, cumulative in zip(STAGE_BUCKETS, itertools.accumulate(buckets)):
+            lines.append(f"{name}_bucket{_format_labels(pairs + (('le', upper),))} {cumulative}")
+        lines.append(f"{name}_bucket{_format_labels(pairs + (('le', '+Inf'),))} {count}")
+        lines.append(f"{name}_count{_format_labels(pairs)} {count}")
+        lines.append(f"{name}_sum{_format_labels(pairs)} {total:.6f}")
+
+    # 进程指标沿用 Prometheus 客户端库的标准名称
+    memory = _process.memory_info()
+    cpu = _process.cpu_times()
+    lines += [
+        "# HELP process_resident_memory_bytes Resident memory size in bytes.",
+        "# TYPE process_resident_memory_bytes gauge",
+        f"process_resident_memory_bytes {memory.rss}",
+        "# HELP process_virtual_memory_bytes Virtual memory size in bytes.",
+        "# TYPE process_virtual_memory_bytes gauge",
+        f"process_virtual_memory_bytes {memory.vms}",
+        "# HELP process_cpu_seconds_total Total user and system CPU time in seconds.",
+        "# TYPE process_cpu_seconds_total counter",
+        f"process_cpu_seconds_total {cpu.user + cpu.system:.3f}",
+        "# HELP process_start_time_seconds Start time of the process since the epoch in seconds.",
+        "# TYPE process_start_time_seconds gauge",
+        f"process_start_time_seconds {_process.create_time():.3f}",
+        "# HELP process_threads Number of OS threads in the process.",
+        "# TYPE process_threads gauge",
+        f"process_threads {_process.num_threads()}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+# Python 3.12 起同一时刻只能有一个 cProfile 处于启用状态，分析模式下被分析的调用依次执行
+_profile_lock = threading.Lock()
+_profile_ids = itertools.count(1)
+
+
+# 一次请求的分析器：run 在调用线程中执行并累计分析数据（流式模拟的多次调用合并为一份），
+# 结束时写出 <目录>/<时间>-<序号>-<名称>.prof；未设置 BURNOUT_PROFILE_DIR 时直接调用
+class RequestProfile:
+    def __init__(self, name):
+        self.name = name
+        self.profile = cProfile.Profile() if PROFILE_DIR else None
+
+    def run(self, fn, *args, **kwargs):
+        if self.profile is None:
+            return fn(*args, **kwargs)
+        with _profile_lock:
+            return self.profile.runcall(fn, *args, **kwargs)
+
+    def dump(self):
+        if self.profile is None:
+            return None
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(
+            PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{next(_profile_ids):06d}-{self.name}.prof"
+        )
+        self.profile.dump_stats(path)
+        return path
+
+
+@contextlib.contextmanager
+def request_profile(name):
+    profile = RequestProfile(name)
+    try:
+        yield profile
+    finally:
+        profile.dump()
@@ -0,0 +1,224 @@
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+import metrics
+from aggregation import WeeklyStats
+
+# 跨进程结果存储：多个 uvicorn 工作进程（及批量计算的工作进程）共用一个本地 SQLite 文件，
+# 按（模拟输入, 随机种子, 规模）保存压缩后的数组，相同请求只计算一次。
+# 设置 BURNOUT_RESULT_STORE 为文件路径启用；为空时不启用，只使用进程内缓存
+RESULT_STORE_PATH = os.environ.get("BURNOUT_RESULT_STORE", "")
+# 存储总大小上限（字节），超出时按最近使用时间淘汰
+RESULT_STORE_MAX_BYTES = int(os.environ.get("BURNOUT_RESULT_STORE_MAX_BYTES", str(256 << 20)))
+# 等待其他进程或线程完成同一计算的上限（秒），超时后自行计算，避免长时间占用工作线程；
+# 以及正在计算的标记过期时间（进程崩溃时由其他进程接手）
+WAIT_TIMEOUT = 10.0
+CLAIM_TTL = 120.0
+POLL_INTERVAL = 0.05
+# 存储格式或模拟模型变化时递增，旧条目自动失效
+STORE_VERSION = 3
+
+WEEKLY_STATS_ARRAYS = ("mean", "m2", "burnout_count", "histogram")
+
+
+def store_key(key):
+    return hashlib.sha256(repr((STORE_VERSION,) + tuple(key)).encode("utf-8")).hexdigest()
+
+
+# 结果（namedtuple）编码为 npz：WeeklyStats 与数组字段存为数组，其余字段存为 JSON
+def encode_result(result):
+    fields, arrays = {}, {}
+    for name, value in zip(result._fields, result):
+        if isinstance(value, WeeklyStats):
+            fields[name] = {"weekly_stats": value.count, "sketch": value.sketch}
+            for attribute in WEEKLY_STATS_ARRAYS:
+                if getattr(value, attribute) is not None:
+                    arrays[f"{name}.{attribute}"] = getattr(value, attribute)
+        elif isinstance(value, np.ndarray):
+            fields[name] = {"array": True}
+            arrays[name] = value
+        else:
+            fields[name] = {"value": value}
+    header = np.frombuffer(json.dumps(fields, default=_to_json).encode("utf-8"), dtype=np.uint8)
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, __fields__=header, **arrays)
+    return buffer.getvalue()
+
+
+# NumPy 标量（如 np.bool_、np.int64）转为 Python 标量后再写入 JSON
+def _to_json(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _from_json(value):
+    return tuple(_from_json(item) for item in value) if isinstance(value, list) else value
+
+
+def decode_result(data, result_type):
+    with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+        fields = json.loads(archive["__fields__"].tobytes().decode("utf-8"))
+        values = {}
+        for name, field in fields.items():
+            if "weekly_stats" in field:
+                stats = WeeklyStats(archive[f"{name}.mean"].size)
+                stats.count = field["weekly_stats"]
+                for attribute in WEEKLY_STATS_ARRAYS:
+                    if attribute != "histogram" or field["sketch"]:
+                        setattr(stats, attribute, archive[f"{name}.{attribute}"])
+                values[name] = stats
+            elif "array" in field:
+                values[name] = archive[name]
+            else:
+                values[name] = _from_json(field["value"])
+    return result_type(**values)
+
+
+class ResultStore:
+    def __init__(self, path, max_bytes=RESULT_STORE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        # 本进程内正在登记或等待的键 -> 结束时触发的事件
+        self._waiting = {}
+        self._waiting_lock = threading.Lock()
+        db = self._connection()
+        db.execute("CREATE TABLE IF NOT EXISTS results ("
+                   "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+                   "last_used REAL NOT NULL)")
+        db.execute("CREATE TABLE IF NOT EXISTS inflight ("
+                   "key TEXT PRIMARY KEY, owner TEXT NOT NULL, started REAL NOT NULL)")
+
+    # 每个线程一个连接（自动提交）；WAL 模式下读写互不阻塞
+    def _connection(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def get_bytes(self, key):
+        db = self._connection()
+        row = db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        db.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    # 写入后按最近使用时间从新到旧累计大小，淘汰超出上限的条目
+    def put_bytes(self, key, data):
+        db = self._connection()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute("INSERT OR REPLACE INTO results (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                       (key, data, len(data), time.time()))
+            db.execute("DELETE FROM results WHERE key IN ("
+                       "SELECT key FROM (SELECT key, SUM(size) OVER "
+                       "(ORDER BY last_used DESC, key ROWS UNBOUNDED PRECEDING) AS total FROM results) "
+                       "WHERE total > ?)", (self.max_bytes,))
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def get(self, key, result_type):
+        data = self.get_bytes(store_key(key))
+        return None if data is None else decode_result(data, result_type)
+
+    def put(self, key, result):
+        self.put_bytes(store_key(key), encode_result(result))
+
+    # 登记正在计算；过期的登记视为所属进程已退出
+    def _claim(self, key):
+        db = self._connection()
+        now = time.time()
+        db.execute("DELETE FROM inflight WHERE key = ? AND started < ?", (key, now - CLAIM_TTL))
+        cursor = db.execute("INSERT OR IGNORE INTO inflight (key, owner, started) VALUES (?, ?, ?)",
+                            (key, f"{os.getpid()}:{threading.get_ident()}", now))
+        return cursor.rowcount == 1
+
+    # 唤醒本进程内等待同一结果的线程
+    def _wake(self, hashed):
+        with self._waiting_lock:
+            event = self._waiting.pop(hashed, None)
+        if event is not None:
+            event.set()
+
+    def release(self, key):
+        hashed = store_key(key)
+        self._connection().execute("DELETE FROM inflight WHERE key = ?", (hashed,))
+        self._wake(hashed)
+
+    # 返回 (结果, 是否由本调用负责计算)：命中时直接返回；否则登记为计算方。
+    # 每个进程每个键只有一个线程登记或轮询 SQLite，本进程的其他线程等待它结束后重新查询；
+    # 其他进程正在计算时轮询等待其结果，超时后不登记、自行计算
+    def lookup_or_claim(self, key, result_type, timeout=WAIT_TIMEOUT):
+        hashed = store_key(key)
+        deadline = time.monotonic() + timeout
+        waited = False
+        while True:
+            data = self.get_bytes(hashed)
+            if data is not None:
+                metrics.inc("result_store_waits_total" if waited else "result_store_hits_total")
+                return decode_result(data, result_type), False
+            with self._waiting_lock:
+                leader = self._waiting.get(hashed)
+                if leader is None:
+                    self._waiting[hashed] = threading.Event()
+            if leader is None:
+                break
+            waited = True
+            if not leader.wait(max(0.0, deadline - time.monotonic())):
+                metrics.inc("result_store_misses_total")
+                return None, False
+
+        owner = False
+        try:
+            while True:
+                if self._claim(hashed):
+                    # 登记前的瞬间其他进程可能刚写入结果
+                    data = self.get_bytes(hashed)
+                    if data is None:
+                        # 由 release() 撤销登记并唤醒等待的线程
+                        owner = True
+                        metrics.inc("result_store_misses_total")
+                        return None, True
+                    self.release(key)
+                    metrics.inc("result_store_hits_total")
+                    return decode_result(data, result_type), False
+                if time.monotonic() > deadline:
+                    metrics.inc("result_store_misses_total")
+                    return None, False
+                waited = True
+                time.sleep(POLL_INTERVAL)
+                data = self.get_bytes(hashed)
+                if data is not None:
+                    metrics.inc("result_store_waits_total")
+                    return decode_result(data, result_type), False
+        finally:
+            if not owner:
+                self._wake(hashed)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+# 进程内共用的存储对象，首次使用时打开；未配置时返回 None
+def shared_store():
+    global _store
+    if not RESULT_STORE_PATH:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = ResultStore(RESULT_STORE_PATH)
+        return _store
@@ -0,0 +1,204 @@
+import argparse
+import collections
+import csv
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from aggregation import WeeklyStats
+from simulation import (
+    BURNOUT_THRESHOLD, DEFAULT_SEED, GENDER_COEFFICIENTS, MAX_STUDY_TIME, WEEKS,
+    find_critical_week, simulate_motivation,
+)
+
+# 名单模式：上传每个学生的实际学习时长、性别与初始动机（可选分组列，如班级），逐个学生模拟，
+# 给出全体、各性别与各分组的结果。文件按列读入紧凑的数组，不为每行创建 Python 对象
+ROSTER_FIELDS = ["class_count", "gender", "initial_motivation"]
+GROUP_FIELD = "group"
+ROSTER_GENDERS = tuple(GENDER_COEFFICIENTS)
+ROSTER_MAX_STUDENTS = int(os.environ.get("BURNOUT_ROSTER_MAX_STUDENTS", "1000000"))
+
+# 名单的列数组：性别与分组为整数编码，分组名称见 group_labels（没有分组列时为空）
+Roster = collections.namedtuple(
+    "Roster", ["study_times", "genders", "initial_motivations", "groups", "group_labels"]
+)
+
+# 一个分组的结果：kind 为 "cohort" / "gender" / "group"；label 为性别或分组名称
+RosterGroup = collections.namedtuple(
+    "RosterGroup", ["kind", "label", "stats", "mean_study_time", "mean_initial_motivation"]
+)
+RosterResult = collections.namedtuple("RosterResult", ["groups", "seed"])
+
+
+def _read_frame(source, name):
+    columns = ROSTER_FIELDS + [GROUP_FIELD]
+    if name.lower().endswith((".parquet", ".pq")):
+        try:
+            frame = pd.read_parquet(source)
+        except ImportError as error:
+            raise ValueError("reading Parquet rosters requires pyarrow") from error
+        return frame[[column for column in columns if column in frame.columns]]
+    return pd.read_csv(
+        source, usecols=lambda column: column in columns, encoding="utf-8-sig",
+        dtype={"class_count": np.float64, "initial_motivation": np.float64,
+               "gender": "category", GROUP_FIELD: "category"},
+    )
+
+
+# 第一处无效行的说明（行号按文件计，表头为第1行）
+def _check(invalid, message):
+    if invalid.any():
+        rows = np.flatnonzero(invalid)
+        raise ValueError(f"{message} (row {rows[0] + 2}; {rows.size} invalid rows)")
+
+
+# 读入并校验名单；约束与网页表单一致，性别缺失按 "other" 处理；出错时抛出 ValueError
+def read_roster(source, name=None):
+    name = name or str(source)
+    try:
+        frame = _read_frame(source, name)
+    except (OSError, pd.errors.ParserError, UnicodeDecodeError) as error:
+        raise ValueError(f"cannot read roster: {error}") from error
+    missing = [field for field in ("class_count", "initial_motivation") if field not in frame.columns]
+    if missing:
+        raise ValueError(f"missing columns: {', '.join(missing)}")
+    if not 0 < len(frame) <= ROSTER_MAX_STUDENTS:
+        raise ValueError(f"roster must have between 1 and {ROSTER_MAX_STUDENTS} students")
+
+    class_counts = pd.to_numeric(frame["class_count"], errors="coerce").to_numpy(np.float64)
+    initial_motivations = pd.to_numeric(frame["initial_motivation"], errors="coerce").to_numpy(np.float64)
+    _check(~(class_counts >= 0), "class_count must be a number >= 0")
+    _check(~((initial_motivations >= 1) & (initial_motivations <= 4)),
+           "initial_motivation must be between 1 and 4")
+
+    # 性别按类别编码转换：只处理不同取值，不逐行处理字符串
+    genders = np.full(len(frame), ROSTER_GENDERS.index("other"), dtype=np.int8)
+    if "gender" in frame.columns:
+        column = frame["gender"].astype("category")
+        names = [str(category).strip().lower() for category in column.cat.categories]
+        # 末尾的 -1 对应缺失值的编码 -1
+        mapping = np.array([ROSTER_GENDERS.index(n) if n in ROSTER_GENDERS else -1 for n in names] + [-1],
+                           dtype=np.int8)
+        codes = column.cat.codes.to_numpy()
+        genders = np.where(codes >= 0, mapping[codes], genders)
+        _check(genders < 0, f"gender must be one of {', '.join(ROSTER_GENDERS)}")
+
+    groups, group_labels = np.zeros(len(frame), dtype=np.int32), []
+    if GROUP_FIELD in frame.columns:
+        column = frame[GROUP_FIELD].astype("category")
+        _check(column.isna().to_numpy(), "group must not be empty")
+        groups = column.cat.codes.to_numpy().astype(np.int32)
+        group_labels = [str(category) for category in column.cat.categories]
+
+    return Roster(
+        np.minimum(MAX_STUDY_TIME, class_counts), genders, initial_motivations, groups, group_labels,
+    )
+
+
+# 逐个学生模拟：全体学生一次向量化模拟，每个学生使用自己的学习时长、性别系数与初始动机。
+# 学生按（分组, 性别）划分单元，每周用 np.bincount 按单元累计动机之和、平方和与厌学人数；
+# 各性别与各分组的统计量由所含单元的累计值相加得到，全体直接使用模拟结果
+def simulate_roster(roster, seed=DEFAULT_SEED, weeks=WEEKS, burnout_threshold=BURNOUT_THRESHOLD):
+    keys = roster.groups.astype(np.int64) * len(ROSTER_GENDERS) + roster.genders
+    cells, cell_ids = np.unique(keys, return_inverse=True)
+    num_cells = cells.size
+
+    # (周数 × 单元) 的累计值；全部学生厌学后模拟提前结束，其后各周沿用最后一周
+    sums = np.zeros((weeks, num_cells))
+    squares = np.zeros((weeks, num_cells))
+    burnout_counts = np.zeros((weeks, num_cells), dtype=np.int64)
+    observed = 0
+
+    def observe(week, motivations, burned_out):
+        nonlocal observed
+        sums[week] = np.bincount(cell_ids, weights=motivations, minlength=num_cells)
+        squares[week] = np.bincount(cell_ids, weights=np.square(motivations), minlength=num_cells)
+        burnout_counts[week] = np.bincount(cell_ids[burned_out], minlength=num_cells)
+        observed = week + 1
+
+    genderdifs = np.array([GENDER_COEFFICIENTS[gender] for gender in ROSTER_GENDERS])[roster.genders]
+    # 编译内核不支持逐个学生的参数，使用 NumPy 后端
+    cohort = simulate_motivation(
+        roster.study_times, genderdifs, roster.initial_motivations,
+        num_students=keys.size, weeks=weeks, burnout_threshold=burnout_threshold,
+        seed=seed, backend="numpy", initial_sd=0, observe=observe,
+    ).stats
+    for totals in (sums, squares, burnout_counts):
+        totals[observed:] = totals[observed - 1]
+
+    counts = np.bincount(cell_ids, minlength=num_cells)
+    study_sums = np.bincount(cell_ids, weights=roster.study_times, minlength=num_cells)
+    motivation_sums = np.bincount(cell_ids, weights=roster.initial_motivations, minlength=num_cells)
+
+    # selected 为单元的下标（切片或布尔数组）
+    def group(kind, label, selected):
+        count = counts[selected].sum()
+        stats = WeeklyStats.from_sums(
+            count, sums[:, selected].sum(axis=1), squares[:, selected].sum(axis=1),
+            burnout_counts[:, selected].sum(axis=1),
+        )
+        return RosterGroup(kind, label, stats, float(study_sums[selected].sum() / count),
+                           float(motivation_sums[selected].sum() / count))
+
+    result = [RosterGroup("cohort", "", cohort, float(roster.study_times.mean()),
+                          float(roster.initial_motivations.mean()))]
+    genders = cells % len(ROSTER_GENDERS)
+    result += [group("gender", ROSTER_GENDERS[g], genders == g) for g in np.unique(genders)]
+    if roster.group_labels:
+        # 单元按（分组, 性别）排序，同一分组的单元相邻
+        groups, starts = np.unique(cells // len(ROSTER_GENDERS), return_index=True)
+        ends = np.append(starts[1:], num_cells)
+        result += [group("group", roster.group_labels[g], slice(start, end))
+                   for g, start, end in zip(groups, starts, ends)]
+    return RosterResult(result, seed)
+
+
+SUMMARY_FIELDS = [
+    "kind", "label", "students", "mean_class_count", "mean_initial_motivation",
+    "critical_week", "final_avg_motivation", "final_burnout_fraction",
+]
+
+
+def summary_rows(result, burnout_threshold=BURNOUT_THRESHOLD):
+    return [{
+        "kind": group.kind,
+        "label": group.label,
+        "students": group.stats.count,
+        "mean_class_count": round(group.mean_study_time, 1),
+        "mean_initial_motivation": round(group.mean_initial_motivation, 2),
+        "critical_week": find_critical_week(group.stats.mean, burnout_threshold),
+        "final_avg_motivation": round(float(group.stats.mean[-1]), 4),
+        "final_burnout_fraction": round(float(group.stats.burnout_fraction[-1]), 4),
+    } for group in result.groups]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Simulate every student of a roster (CSV or Parquet with class_count, gender, "
+                    "initial_motivation and an optional group column) and summarize by subgroup."
+    )
+    parser.add_argument("input", help="roster path (.csv or .parquet)")
+    parser.add_argument("-o", "--output", default="-", help="summary CSV path (default: stdout)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+
+    try:
+        roster = read_roster(args.input)
+    except ValueError as error:
+        parser.exit(2, f"{parser.prog}: error: {error}\n")
+    rows = summary_rows(simulate_roster(roster, args.seed))
+
+    target = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        writer = csv.DictWriter(target, SUMMARY_FIELDS, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+    finally:
+        if target is not sys.stdout:
+            target.close()
+
+
+if __name__ == "__main__":
+    main()
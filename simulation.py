@@ -0,0 +1,547 @@
+import collections
+import functools
+import os
+import secrets
+import threading
+
+import numpy as np
+
+import metrics
+import result_store
+from aggregation import WeeklyStats
+
+# 可选的 numba 编译后端
+try:
+    import simulation_numba
+except ImportError:
+    simulation_numba = None
+
+# 模拟默认参数
+NUM_STUDENTS = 1000
+WEEKS = 70
+BURNOUT_THRESHOLD = 1.0
+MAX_STUDY_TIME = 100
+
+# 性别差异系数
+GENDER_COEFFICIENTS = {
+    "male": 0.0043,
+    "female": 0.0051,
+    "other": 0.0047,
+}
+
+# 结果缓存：进程内所有会话共享，按LRU淘汰
+DEFAULT_SEED = 20250822
+SIMULATION_CACHE_SIZE = int(os.environ.get("BURNOUT_SIM_CACHE_SIZE", "256"))
+
+# 模拟后端："numpy"（默认）或 "numba"（并行编译内核，适合超大规模人群）
+SIMULATION_BACKEND = os.environ.get("BURNOUT_SIM_BACKEND", "numpy")
+
+
+# 初始动机围绕输入值的个体差异（标准差）；名单模式使用每个学生的实际值，取 0
+INITIAL_SD = 0.5
+
+
+def gender_coefficient(gender):
+    return GENDER_COEFFICIENTS.get(gender, GENDER_COEFFICIENTS["other"])
+
+
+# 选择实际使用的后端；numba 不可用时回退到 NumPy
+def resolve_backend(backend=None):
+    backend = backend or SIMULATION_BACKEND
+    if backend == "numba" and simulation_numba is not None:
+        return "numba"
+    return "numpy"
+
+
+def warm_up_backend(backend=None):
+    if resolve_backend(backend) == "numba":
+        simulation_numba.warm_up()
+
+
+# 流式模拟的阶段性结果：已完成周数、截至目前每周的平均动机与厌学比例
+SimulationProgress = collections.namedtuple(
+    "SimulationProgress", ["weeks_done", "avg_motivations", "burnout_fractions"]
+)
+
+# 模拟结果：每周统计量始终保留；逐周逐人的完整历史只在 keep_history=True 时保留；
+# seed 为本次使用的随机种子，相同种子与参数可逐位复现同一结果
+SimulationResult = collections.namedtuple(
+    "SimulationResult",
+    ["stats", "motivation_history", "burnout_history", "burnout_weeks", "seed"],
+    defaults=(None, None, None, None),
+)
+
+# 计数器型随机数：学生按固定大小分块，每块使用由（种子, 块序号）确定的独立 Philox 随机流，
+# 分块、并行计算与一次算完的结果逐位相同
+STREAM_BLOCK_SIZE = 1 << 16
+
+
+# 未指定种子时随机生成一个，并随结果返回以便复现
+def new_seed():
+    return secrets.randbits(63)
+
+
+def student_stream(seed, block):
+    return np.random.Generator(np.random.Philox(np.random.SeedSequence(seed, spawn_key=(block,))))
+
+
+# 本次模拟覆盖的随机流分块：(块序号, 本次学生数组中的切片)；起始学生须对齐分块边界
+def _stream_blocks(first_student, num_students):
+    if first_student % STREAM_BLOCK_SIZE:
+        raise ValueError("first_student must be a multiple of STREAM_BLOCK_SIZE")
+    first_block = first_student // STREAM_BLOCK_SIZE
+    return [
+        (first_block + offset // STREAM_BLOCK_SIZE,
+         slice(offset, min(offset + STREAM_BLOCK_SIZE, num_students)))
+        for offset in range(0, num_students, STREAM_BLOCK_SIZE)
+    ]
+
+
+# 按块序号依次合并各分块的每周统计量；合并顺序固定，浮点结果与分块方式无关
+def fold_stats(block_stats, weeks):
+    stats = WeeklyStats(weeks)
+    for block in block_stats:
+        stats.merge(block)
+    return stats
+
+
+# 每个学生的参数：标量对所有学生相同，数组则按本次学生顺序逐个对应
+def _per_student(value, students):
+    return value[students] if np.ndim(value) else value
+
+
+# 编译内核按小段累计的统计量，依次合并为各随机流分块的每周统计量
+def _numba_block_stats(study_time, genderdif, initial_motivation, num_students, weeks,
+                       burnout_threshold, kernel_seed, first_student, blocks):
+    counts, means, m2s, burnout_counts = simulation_numba.simulate_chunk_stats_numba(
+        study_time, genderdif, initial_motivation,
+        num_students, weeks, burnout_threshold, seed=kernel_seed, first_student=first_student,
+    )
+    chunk_size = simulation_numba.STATS_CHUNK_SIZE
+    block_stats = []
+    for _, students in blocks:
+        stats = WeeklyStats(weeks)
+        for chunk in range(students.start // chunk_size, -(-students.stop // chunk_size)):
+            part = WeeklyStats(weeks)
+            part.count = int(counts[chunk])
+            part.mean, part.m2, part.burnout_count = means[chunk], m2s[chunk], burnout_counts[chunk]
+            stats.merge(part)
+        block_stats.append(stats)
+    return block_stats
+
+
+# 逐块推进模拟，汇报阶段结果；返回 (各分块的每周统计量, 完整历史或 None)。
+# 学习时长、性别系数与初始动机可以是长度为 num_students 的数组（仅 NumPy 后端）。
+# observe(week, motivations, burned_out) 在每周更新后以全体学生的当前状态调用（仅 NumPy 后端），
+# 可用于按任意分组累计；全部学生厌学后提前结束，之后各周不再调用
+def _iter_blocks(study_time, genderdif, initial_motivation, num_students, weeks,
+                 burnout_threshold, seed, first_student, backend, chunk_weeks,
+                 keep_history, dtype, initial_sd=INITIAL_SD, observe=None):
+    blocks = _stream_blocks(first_student, num_students)
+
+    # 编译内核只支持全体学生共用同一组参数
+    shared = initial_sd == INITIAL_SD and observe is None and not any(
+        np.ndim(value) for value in (study_time, genderdif, initial_motivation)
+    )
+    if resolve_backend(backend) == "numba" and shared:
+        # 编译内核一次算完全部周数，只在结束时汇报；内核中每个学生按全局序号使用独立随机流
+        kernel_seed = int(np.random.SeedSequence(seed).generate_state(1, np.uint64)[0])
+        if keep_history:
+            motivation_history, burnout_history, burnout_weeks = simulation_numba.simulate_motivation_numba(
+                study_time, genderdif, initial_motivation,
+                num_students, weeks, burnout_threshold, seed=kernel_seed, first_student=first_student,
+            )
+            block_stats = [WeeklyStats.from_history(motivation_history[:, students], burnout_history[:, students])
+                           for _, students in blocks]
+        else:
+            # 不保留历史时内核直接累计每周统计量，不分配 (学生 × 周数) 数组
+            block_stats = _numba_block_stats(
+                study_time, genderdif, initial_motivation, num_students, weeks,
+                burnout_threshold, kernel_seed, first_student, blocks,
+            )
+        stats = fold_stats(block_stats, weeks)
+        yield SimulationProgress(weeks, stats.mean, stats.burnout_fraction)
+        return block_stats, (motivation_history, burnout_history, burnout_weeks) if keep_history else None
+
+    # 初始化动机及其他参数：每个分块从自己的随机流依次抽取
+    streams = [student_stream(seed, block) for block, _ in blocks]
+    initial_motivations = np.empty(num_students)
+    learning_efficiencies = np.empty(num_students)
+    stress_resistances = np.empty(num_students)
+    for (_, students), stream in zip(blocks, streams):
+        size = students.stop - students.start
+        initial_motivations[students] = stream.normal(_per_student(initial_motivation, students), initial_sd, size)
+        learning_efficiencies[students] = stream.normal(0.5, 0.1, size)
+        stress_resistances[students] = stream.normal(0.5, 0.1, size)
+    initial_motivations = np.clip(initial_motivations, 1, 5).astype(dtype)
+    learning_efficiencies = np.clip(learning_efficiencies, 0, 1)
+    stress_resistances = np.clip(stress_resistances, 0, 1)
+
+    # 动机衰减计算：每个学生每周的衰减量不变，提前一次算好
+    efficiency_factor = 1 - learning_efficiencies * 0.5
+    resistance_factor = 1 - stress_resistances * 0.5
+    motivation_decay = (genderdif * study_time * efficiency_factor * resistance_factor).astype(dtype)
+
+    # 结果存储：默认只保留每周统计量，内存与学生人数无关
+    block_stats = [WeeklyStats(weeks) for _ in blocks]
+    if keep_history:
+        motivation_history = np.zeros((weeks, num_students), dtype=dtype)
+        burnout_history = np.zeros((weeks, num_students), dtype=bool)
+        burnout_weeks = np.full(num_students, np.nan)
+
+    current_motivations = initial_motivations
+    burned_out = np.zeros(num_students, dtype=bool)
+    random_fluctuations = np.empty(num_students, dtype=dtype)
+
+    # 每周所有学生同时更新；厌学为吸收态，已厌学的学生动机保持不变
+    for week in range(weeks):
+        # 随机波动：每个分块从自己的随机流抽取本周噪声
+        for (_, students), stream in zip(blocks, streams):
+            stream.standard_normal(dtype=dtype, out=random_fluctuations[students])
+        random_fluctuations *= dtype(0.08)
+        updated = np.maximum(0, current_motivations - motivation_decay + random_fluctuations)
+        current_motivations = np.where(burned_out, current_motivations, updated)
+
+        # 检查厌学
+        newly_burned_out = ~burned_out & (current_motivations <= burnout_threshold)
+        burned_out |= newly_burned_out
+
+        for (_, students), stats in zip(blocks, block_stats):
+            stats.add(week, current_motivations[students], burned_out[students])
+        if observe is not None:
+            observe(week, current_motivations, burned_out)
+        if keep_history:
+            burnout_weeks[newly_burned_out] = week + 1
+            motivation_history[week] = current_motivations
+            burnout_history[week] = burned_out
+
+        # 全部学生都已厌学：之后各周不再变化，无需继续抽取随机数
+        if burned_out.all():
+            for stats in block_stats:
+                stats.fill_from(week)
+            if keep_history:
+                motivation_history[week+1:] = current_motivations
+                burnout_history[week+1:] = True
+            break
+
+        if (week + 1) % chunk_weeks == 0 and week + 1 < weeks:
+            stats = fold_stats(block_stats, weeks)
+            yield SimulationProgress(week + 1, stats.mean[:week+1].copy(),
+                                     stats.burnout_fraction[:week+1])
+
+    stats = fold_stats(block_stats, weeks)
+    yield SimulationProgress(weeks, stats.mean, stats.burnout_fraction)
+    return block_stats, (motivation_history, burnout_history, burnout_weeks) if keep_history else None
+
+
+# first_student 为本次模拟的第一个学生在整个人群中的序号（须为 STREAM_BLOCK_SIZE 的整数倍），
+# 用于把一个人群拆成多段分别计算
+def iter_simulation(study_time, genderdif, initial_motivation,
+                    num_students=NUM_STUDENTS, weeks=WEEKS,
+                    burnout_threshold=BURNOUT_THRESHOLD, seed=None, first_student=0, backend=None,
+                    chunk_weeks=5, keep_history=False, dtype=np.float64, initial_sd=INITIAL_SD,
+                    observe=None):
+    if seed is None:
+        seed = new_seed()
+    block_stats, history = yield from _iter_blocks(
+        study_time, genderdif, initial_motivation, num_students, weeks, burnout_threshold,
+        seed, first_student, backend, chunk_weeks, keep_history, dtype, initial_sd, observe,
+    )
+    stats = fold_stats(block_stats, weeks)
+    if keep_history:
+        return SimulationResult(stats, *history, seed=seed)
+    return SimulationResult(stats, seed=seed)
+
+
+# 推进一块流式模拟：返回 (阶段结果, None)；结束时返回 (None, 最终结果)
+def advance(stream):
+    try:
+        return next(stream), None
+    except StopIteration as stop:
+        return None, stop.value
+
+
+def simulate_motivation(study_time, genderdif, initial_motivation,
+                        num_students=NUM_STUDENTS, weeks=WEEKS,
+                        burnout_threshold=BURNOUT_THRESHOLD, seed=None, first_student=0,
+                        backend=None, keep_history=False, dtype=np.float64, initial_sd=INITIAL_SD,
+                        observe=None):
+    stream = iter_simulation(
+        study_time, genderdif, initial_motivation,
+        num_students=num_students, weeks=weeks, burnout_threshold=burnout_threshold,
+        seed=seed, first_student=first_student, backend=backend, chunk_weeks=weeks,
+        keep_history=keep_history, dtype=dtype, initial_sd=initial_sd, observe=observe,
+    )
+    while True:
+        progress, result = advance(stream)
+        if progress is None:
+            return result
+
+
+# 一段学生（从 first_student 开始）各随机流分块的每周统计量；可在工作进程中调用
+def simulate_block_stats(study_time, genderdif, initial_motivation, num_students, first_student,
+                         weeks=WEEKS, burnout_threshold=BURNOUT_THRESHOLD, seed=DEFAULT_SEED,
+                         backend=None, dtype=np.float32):
+    stream = _iter_blocks(
+        study_time, genderdif, initial_motivation, num_students, weeks, burnout_threshold,
+        seed, first_student, backend, weeks, False, dtype,
+    )
+    while True:
+        progress, result = advance(stream)
+        if progress is None:
+            return result[0]
+
+
+# 超大规模人群：学生分段模拟并按块序号合并每周统计量，内存只取决于分段大小；
+# 传入 executor 时各段并行计算。分段大小取随机流分块的整数倍，结果与一次算完逐位相同
+STATS_BLOCK_SIZE = 1 << 18
+
+
+def simulate_statistics(study_time, genderdif, initial_motivation,
+                        num_students=NUM_STUDENTS, weeks=WEEKS,
+                        burnout_threshold=BURNOUT_THRESHOLD, seed=None, backend=None,
+                        block_size=STATS_BLOCK_SIZE, dtype=np.float32, executor=None):
+    if seed is None:
+        seed = new_seed()
+    block_size = max(STREAM_BLOCK_SIZE, block_size // STREAM_BLOCK_SIZE * STREAM_BLOCK_SIZE)
+
+    starts = range(0, num_students, block_size)
+    sizes = [min(block_size, num_students - start) for start in starts]
+    segment = functools.partial(
+        simulate_block_stats, study_time, genderdif, initial_motivation,
+        weeks=weeks, burnout_threshold=burnout_threshold, seed=seed, backend=backend, dtype=dtype,
+    )
+    segments = executor.map(segment, sizes, starts) if executor is not None else map(segment, sizes, starts)
+
+    stats = WeeklyStats(weeks)
+    for block_stats in segments:
+        for block in block_stats:
+            stats.merge(block)
+    return SimulationResult(stats, seed=seed)
+
+
+CacheInfo = collections.namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+# 进程内LRU缓存，带命中/未命中计数，线程安全
+class SimulationCache:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return result
+
+    def put(self, key, result):
+        # 缓存结果在会话间共享，设为只读防止被修改
+        result.stats.freeze()
+        for array in result[1:]:
+            if isinstance(array, np.ndarray):
+                array.setflags(write=False)
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+
+simulation_cache = SimulationCache(SIMULATION_CACHE_SIZE)
+
+# 缓存的命中/未命中次数与当前条目数在 /metrics 导出
+metrics.register_counters(lambda: {
+    "simulation_cache_hits_total": simulation_cache.hits,
+    "simulation_cache_misses_total": simulation_cache.misses,
+})
+metrics.register_gauges(lambda: {"simulation_cache_entries": simulation_cache.info().currsize})
+
+
+# 缓存键：（限幅后的学习时长, 性别系数, 保留一位小数的初始动机, 随机种子）及模拟规模
+def simulation_key(study_time, genderdif, initial_motivation, seed=DEFAULT_SEED,
+                   num_students=NUM_STUDENTS, weeks=WEEKS,
+                   burnout_threshold=BURNOUT_THRESHOLD, backend=None,
+                   keep_history=False, dtype=np.float64):
+    return (
+        float(min(MAX_STUDY_TIME, study_time)), float(genderdif),
+        round(float(initial_motivation), 1), seed,
+        num_students, weeks, burnout_threshold, resolve_backend(backend),
+        bool(keep_history), np.dtype(dtype).name,
+    )
+
+
+def cached_simulation(study_time, genderdif, initial_motivation, seed=DEFAULT_SEED,
+                      num_students=NUM_STUDENTS, weeks=WEEKS,
+                      burnout_threshold=BURNOUT_THRESHOLD, backend=None,
+                      keep_history=False, dtype=np.float64):
+    stream = stream_cached_simulation(
+        study_time, genderdif, initial_motivation, seed=seed,
+        num_students=num_students, weeks=weeks, burnout_threshold=burnout_threshold,
+        backend=backend, chunk_weeks=weeks, keep_history=keep_history, dtype=dtype,
+    )
+    while True:
+        progress, result = advance(stream)
+        if progress is None:
+            return result
+
+
+# 依次查进程内缓存与跨进程结果存储，都未命中时运行 compute()（流式生成器）并写回两者；
+# 其他进程或线程正在计算同一结果时等待其完成，不重复计算
+def stream_through_caches(key, result_type, compute):
+    result = simulation_cache.get(key)
+    if result is not None:
+        return result
+    store = result_store.shared_store()
+    if store is None:
+        result = yield from compute()
+    else:
+        result, owner = store.lookup_or_claim(key, result_type)
+        if result is None:
+            try:
+                result = yield from compute()
+                store.put(key, result)
+            finally:
+                # 计算出错或被放弃（生成器被关闭）时同样撤销登记，等待方随即接手
+                if owner:
+                    store.release(key)
+    simulation_cache.put(key, result)
+    return result
+
+
+# 流式版本：缓存命中时不产生阶段结果，直接返回；未命中时边算边汇报，结束后写入缓存
+def stream_cached_simulation(study_time, genderdif, initial_motivation, seed=DEFAULT_SEED,
+                             num_students=NUM_STUDENTS, weeks=WEEKS,
+                             burnout_threshold=BURNOUT_THRESHOLD, backend=None,
+                             chunk_weeks=5, keep_history=False, dtype=np.float64):
+    key = simulation_key(study_time, genderdif, initial_motivation, seed,
+                         num_students, weeks, burnout_threshold, backend, keep_history, dtype)
+    return (yield from stream_through_caches(key, SimulationResult, lambda: iter_simulation(
+        *key[:3],
+        num_students=num_students, weeks=weeks, burnout_threshold=burnout_threshold,
+        seed=seed, backend=key[7], chunk_weeks=chunk_weeks,
+        keep_history=keep_history, dtype=dtype,
+    )))
+
+
+def simulation_cache_info():
+    return simulation_cache.info()
+
+
+# 平均动机曲线首次由阈值上方穿过阈值的周数（从1开始计），未穿过返回None
+def find_critical_week(avg_motivations, burnout_threshold=BURNOUT_THRESHOLD):
+    crossed = (avg_motivations[:-1] >= burnout_threshold) & (avg_motivations[1:] <= burnout_threshold)
+    if not crossed.any():
+        return None
+    return int(np.argmax(crossed)) + 2
+
+
+# 参数扫描默认网格：学习时长0-100、三种性别系数、初始动机1-4（步长0.1）
+SWEEP_STUDY_TIMES = np.arange(0, MAX_STUDY_TIME + 1)
+SWEEP_GENDERS = tuple(GENDER_COEFFICIENTS)
+SWEEP_INITIAL_MOTIVATIONS = np.round(np.arange(1.0, 4.0 + 1e-9, 0.1), 1)
+
+
+# 每个情景与网页的单点模拟使用相同的随机流（种子相同时逐位一致），结果与网格组成和分批方式无关；
+# 各情景共用同一组随机数，每周的噪声只抽取一次并广播到本批全部情景
+def simulate_sweep(study_times=SWEEP_STUDY_TIMES, genders=SWEEP_GENDERS,
+                   initial_motivations=SWEEP_INITIAL_MOTIVATIONS,
+                   num_students=NUM_STUDENTS, weeks=WEEKS,
+                   burnout_threshold=BURNOUT_THRESHOLD, seed=None,
+                   scenarios_per_batch=256):
+    if seed is None:
+        seed = new_seed()
+    blocks = _stream_blocks(0, num_students)
+
+    study_times = np.minimum(MAX_STUDY_TIME, np.asarray(study_times, dtype=float))
+    initial_motivations = np.asarray(initial_motivations, dtype=float)
+    genderdifs = np.array([gender_coefficient(g) for g in genders])
+
+    # 情景轴：学习时长 × 性别 × 初始动机 展平为一维
+    grid_study, grid_gender, grid_motivation = np.meshgrid(
+        study_times, genderdifs, initial_motivations, indexing="ij"
+    )
+    grid_study = grid_study.ravel()
+    grid_gender = grid_gender.ravel()
+    grid_motivation = grid_motivation.ravel()
+    num_scenarios = grid_study.size
+
+    avg_motivations = np.empty((num_scenarios, weeks))
+
+    # 分批推进 (情景 × 学生) 数组，控制内存占用；每批从头重放各分块的随机流
+    for start in range(0, num_scenarios, scenarios_per_batch):
+        stop = min(start + scenarios_per_batch, num_scenarios)
+        streams = [student_stream(seed, block) for block, _ in blocks]
+
+        # 与 _iter_blocks 相同的抽取顺序：每个分块依次抽取初始动机、学习效率与抗压能力
+        initial_noise = np.empty(num_students)
+        learning_efficiencies = np.empty(num_students)
+        stress_resistances = np.empty(num_students)
+        for (_, students), stream in zip(blocks, streams):
+            size = students.stop - students.start
+            initial_noise[students] = stream.standard_normal(size)
+            learning_efficiencies[students] = stream.normal(0.5, 0.1, size)
+            stress_resistances[students] = stream.normal(0.5, 0.1, size)
+        initial = np.clip(grid_motivation[start:stop, None] + INITIAL_SD * initial_noise, 1, 5)
+        efficiency_factor = 1 - np.clip(learning_efficiencies, 0, 1) * 0.5
+        resistance_factor = 1 - np.clip(stress_resistances, 0, 1) * 0.5
+        motivation_decay = (grid_gender[start:stop, None] * grid_study[start:stop, None]
+                            * efficiency_factor * resistance_factor)
+
+        current_motivations = initial
+        burned_out = np.zeros(initial.shape, dtype=bool)
+        random_fluctuations = np.empty(num_students)
+        for week in range(weeks):
+            for (_, students), stream in zip(blocks, streams):
+                stream.standard_normal(out=random_fluctuations[students])
+            random_fluctuations *= 0.08
+            updated = np.maximum(0, current_motivations - motivation_decay + random_fluctuations)
+            current_motivations = np.where(burned_out, current_motivations, updated)
+            burned_out |= current_motivations <= burnout_threshold
+
+            # 与 WeeklyStats 相同：各分块分别求均值，再按块序号依次合并
+            count, mean = 0, 0.0
+            for _, students in blocks:
+                size = students.stop - students.start
+                block_mean = current_motivations[:, students].mean(axis=1)
+                mean = block_mean if count == 0 else mean + (block_mean - mean) * (size / (count + size))
+                count += size
+            avg_motivations[start:stop, week] = mean
+
+    # 每个情景的关键周（未穿过阈值为NaN）
+    crossed = ((avg_motivations[:, :-1] >= burnout_threshold)
+               & (avg_motivations[:, 1:] <= burnout_threshold))
+    critical_weeks = np.where(crossed.any(axis=1), np.argmax(crossed, axis=1) + 2.0, np.nan)
+
+    grid_shape = (study_times.size, len(genders), initial_motivations.size)
+    return {
+        "study_times": study_times,
+        "genders": tuple(genders),
+        "initial_motivations": initial_motivations,
+        "avg_motivations": avg_motivations.reshape(grid_shape + (weeks,)),
+        "critical_weeks": critical_weeks.reshape(grid_shape),
+        "seed": seed,
+    }
+
+
+# 将扫描结果展开为表格行：(学习时长, 性别, 初始动机, 关键周)
+def sweep_table(sweep):
+    rows = []
+    for i, study_time in enumerate(sweep["study_times"]):
+        for j, gender in enumerate(sweep["genders"]):
+            for k, initial_motivation in enumerate(sweep["initial_motivations"]):
+                week = sweep["critical_weeks"][i, j, k]
+                rows.append((float(study_time), gender, float(initial_motivation),
+                             None if np.isnan(week) else int(week)))
+    return rows
@@ -0,0 +1,132 @@
+import math
+
+import numba
+import numpy as np
+
+# 每个学生使用独立的 splitmix64 随机流：结果与线程数、调度顺序无关
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+_STREAM_MULTIPLIER = np.uint64(0xD1B54A32D192ED03)
+
+# 只统计时每个并行小段的学生数；须整除随机流分块大小，使各分块由整数个小段组成
+STATS_CHUNK_SIZE = 1024
+
+
+@numba.njit(cache=True)
+def _splitmix64(state):
+    state = state + _GOLDEN_GAMMA
+    z = state
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return state, z ^ (z >> np.uint64(31))
+
+
+# Box-Muller 生成标准正态随机数
+@numba.njit(cache=True)
+def _standard_normal(state):
+    state, a = _splitmix64(state)
+    state, b = _splitmix64(state)
+    u1 = ((a >> np.uint64(11)) + np.uint64(1)) * (1.0 / 9007199254740992.0)
+    u2 = (b >> np.uint64(11)) * (1.0 / 9007199254740992.0)
+    return state, math.sqrt(-2.0 * math.log(u1)) * math.cos(2.0 * math.pi * u2)
+
+
+# 学生的随机流与个体参数：返回 (随机流状态, 初始动机, 每周衰减量)
+@numba.njit(cache=True)
+def _init_student(study_time, genderdif, initial_motivation, seed, student):
+    # 随机流由学生在整个人群中的序号决定，分段计算与一次算完结果相同
+    state = np.uint64(seed) ^ (np.uint64(student + 1) * _STREAM_MULTIPLIER)
+
+    # 初始化动机及其他参数
+    state, z = _standard_normal(state)
+    motivation = min(max(initial_motivation + 0.5 * z, 1.0), 5.0)
+    state, z = _standard_normal(state)
+    learning_efficiency = min(max(0.5 + 0.1 * z, 0.0), 1.0)
+    state, z = _standard_normal(state)
+    stress_resistance = min(max(0.5 + 0.1 * z, 0.0), 1.0)
+
+    motivation_decay = (genderdif * study_time
+                        * (1 - learning_efficiency * 0.5) * (1 - stress_resistance * 0.5))
+    return state, motivation, motivation_decay
+
+
+@numba.njit(parallel=True, cache=True)
+def _simulate_kernel(study_time, genderdif, initial_motivation, burnout_threshold, seed,
+                     first_student, motivation_history, burnout_history, burnout_weeks):
+    num_students, weeks = motivation_history.shape
+    for student in numba.prange(num_students):
+        state, motivation, motivation_decay = _init_student(
+            study_time, genderdif, initial_motivation, seed, first_student + student
+        )
+
+        burned_out = False
+        for week in range(weeks):
+            if not burned_out:
+                state, z = _standard_normal(state)
+                motivation = max(0.0, motivation - motivation_decay + 0.08 * z)
+                if motivation <= burnout_threshold:
+                    burned_out = True
+                    burnout_weeks[student] = week + 1
+            motivation_history[student, week] = motivation
+            burnout_history[student, week] = burned_out
+
+
+# 只统计不保留历史：学生按固定大小的小段并行，每段逐个学生用 Welford 方法累计每周均值、
+# 离差平方和与厌学人数；小段划分与线程数无关，结果可复现
+@numba.njit(parallel=True, cache=True)
+def _stats_kernel(study_time, genderdif, initial_motivation, burnout_threshold, seed,
+                  first_student, num_students, chunk_size, means, m2s, burnout_counts):
+    num_chunks, weeks = means.shape
+    for chunk in numba.prange(num_chunks):
+        begin = chunk * chunk_size
+        for student in range(begin, min(begin + chunk_size, num_students)):
+            state, motivation, motivation_decay = _init_student(
+                study_time, genderdif, initial_motivation, seed, first_student + student
+            )
+            count = student - begin + 1
+
+            burned_out = False
+            for week in range(weeks):
+                if not burned_out:
+                    state, z = _standard_normal(state)
+                    motivation = max(0.0, motivation - motivation_decay + 0.08 * z)
+                    if motivation <= burnout_threshold:
+                        burned_out = True
+                delta = motivation - means[chunk, week]
+                means[chunk, week] += delta / count
+                m2s[chunk, week] += delta * (motivation - means[chunk, week])
+                if burned_out:
+                    burnout_counts[chunk, week] += 1
+
+
+def simulate_motivation_numba(study_time, genderdif, initial_motivation,
+                              num_students, weeks, burnout_threshold, seed, first_student=0):
+    # 按学生连续存储，返回转置视图以保持 (周数 × 学生) 的形状
+    motivation_history = np.empty((num_students, weeks))
+    burnout_history = np.empty((num_students, weeks), dtype=np.bool_)
+    burnout_weeks = np.full(num_students, np.nan)
+    _simulate_kernel(float(study_time), float(genderdif), float(initial_motivation),
+                     float(burnout_threshold), np.uint64(seed), np.int64(first_student),
+                     motivation_history, burnout_history, burnout_weeks)
+    return motivation_history.T, burnout_history.T, burnout_weeks
+
+
+# 每个小段的 (人数, 每周均值, 每周离差平方和, 每周厌学人数)，小段依次覆盖全部学生；
+# 内存只与小段数和周数有关
+def simulate_chunk_stats_numba(study_time, genderdif, initial_motivation,
+                               num_students, weeks, burnout_threshold, seed, first_student=0,
+                               chunk_size=STATS_CHUNK_SIZE):
+    num_chunks = -(-num_students // chunk_size)
+    means = np.zeros((num_chunks, weeks))
+    m2s = np.zeros((num_chunks, weeks))
+    burnout_counts = np.zeros((num_chunks, weeks), dtype=np.int64)
+    _stats_kernel(float(study_time), float(genderdif), float(initial_motivation),
+                  float(burnout_threshold), np.uint64(seed), np.int64(first_student),
+                  np.int64(num_students), np.int64(chunk_size), means, m2s, burnout_counts)
+    counts = np.minimum(chunk_size, num_students - np.arange(num_chunks) * chunk_size)
+    return counts, means, m2s, burnout_counts
+
+
+# 启动时预热 JIT 缓存，避免首个请求承担编译耗时
+def warm_up():
+    simulate_motivation_numba(40, 0.0047, 3.0, 2, 2, 1.0, 0)
+    simulate_chunk_stats_numba(40, 0.0047, 3.0, 2, 2, 1.0, 0)
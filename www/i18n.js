@@ -0,0 +1,10 @@
+// 语言切换：按 data-i18n 键替换页面文字，不重建DOM，输入状态保持不变
+(function () {
+  Shiny.addCustomMessageHandler("burnout-i18n", function (message) {
+    document.documentElement.lang = message.lang;
+    document.querySelectorAll("[data-i18n]").forEach(function (node) {
+      var text = message.texts[node.getAttribute("data-i18n")];
+      if (text !== undefined) node.textContent = text;
+    });
+  });
+})();
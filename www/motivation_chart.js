@@ -0,0 +1,109 @@
+// 客户端绘图：根据服务器发送的曲线数据绘制动机趋势图（SVG）
+(function () {
+  var SVG_NS = "http://www.w3.org/2000/svg";
+  var WIDTH = 1000, HEIGHT = 600;
+  var MARGIN = { top: 50, right: 25, bottom: 60, left: 70 };
+
+  function el(name, attrs, text) {
+    var node = document.createElementNS(SVG_NS, name);
+    for (var key in attrs) node.setAttribute(key, attrs[key]);
+    if (text !== undefined) node.textContent = text;
+    return node;
+  }
+
+  function draw(container, data) {
+    container.innerHTML = "";
+    if (!data) return;
+
+    var weeks = data.weeks || data.curve.length;
+    var plotW = WIDTH - MARGIN.left - MARGIN.right;
+    var plotH = HEIGHT - MARGIN.top - MARGIN.bottom;
+    var x = function (week) { return MARGIN.left + (week - 1) / Math.max(weeks - 1, 1) * plotW; };
+    var y = function (value) { return MARGIN.top + (1 - value / data.y_max) * plotH; };
+
+    var svg = el("svg", { viewBox: "0 0 " + WIDTH + " " + HEIGHT, width: "100%", height: "100%",
+                          "font-family": "sans-serif", "font-size": 14 });
+
+    // 动机区域背景色
+    data.zones.forEach(function (zone) {
+      svg.appendChild(el("rect", { x: MARGIN.left, y: y(zone[1]), width: plotW,
+                                   height: y(zone[0]) - y(zone[1]), fill: zone[2], "fill-opacity": 0.1 }));
+    });
+
+    // 网格与刻度
+    for (var value = 0; value <= data.y_max; value++) {
+      svg.appendChild(el("line", { x1: MARGIN.left, x2: MARGIN.left + plotW, y1: y(value), y2: y(value),
+                                   stroke: "#b0b0b0", "stroke-dasharray": "4 4", "stroke-opacity": 0.7 }));
+      svg.appendChild(el("text", { x: MARGIN.left - 8, y: y(value) + 5, "text-anchor": "end" }, value));
+    }
+    for (var week = 10; week <= weeks; week += 10) {
+      svg.appendChild(el("line", { x1: x(week), x2: x(week), y1: MARGIN.top, y2: MARGIN.top + plotH,
+                                   stroke: "#b0b0b0", "stroke-dasharray": "4 4", "stroke-opacity": 0.7 }));
+      svg.appendChild(el("text", { x: x(week), y: MARGIN.top + plotH + 20, "text-anchor": "middle" }, week));
+    }
+    svg.appendChild(el("rect", { x: MARGIN.left, y: MARGIN.top, width: plotW, height: plotH,
+                                 fill: "none", stroke: "black" }));
+
+    // 厌学阈值线
+    svg.appendChild(el("line", { x1: MARGIN.left, x2: MARGIN.left + plotW, y1: y(data.threshold),
+                                 y2: y(data.threshold), stroke: "red", "stroke-width": 1.5,
+                                 "stroke-dasharray": "8 5" }));
+
+    // 平均动机曲线的置信带
+    if (data.band) {
+      var upper = data.band[1].map(function (value, i) { return x(i + 1) + "," + y(value); });
+      var lower = data.band[0].map(function (value, i) { return x(i + 1) + "," + y(value); }).reverse();
+      svg.appendChild(el("polygon", { points: upper.concat(lower).join(" "), fill: "blue",
+                                      "fill-opacity": 0.2 }));
+    }
+
+    // 平均动机曲线
+    var points = data.curve.map(function (value, i) { return x(i + 1) + "," + y(value); }).join(" ");
+    svg.appendChild(el("polyline", { points: points, fill: "none", stroke: "blue", "stroke-width": 2.5 }));
+
+    // 标注与厌学阈值的交点
+    if (data.cross) {
+      var cx = x(data.cross[0]), cy = y(data.cross[1]);
+      svg.appendChild(el("circle", { cx: cx, cy: cy, r: 7, fill: "red", stroke: "black", "stroke-width": 1.5 }));
+      svg.appendChild(el("text", { x: cx + 8, y: cy - 12, "font-size": 13 }, data.text.cross));
+    }
+
+    // 标题与坐标轴标签
+    svg.appendChild(el("text", { x: MARGIN.left + plotW / 2, y: 30, "text-anchor": "middle",
+                                 "font-size": 18 }, data.text.title));
+    svg.appendChild(el("text", { x: MARGIN.left + plotW / 2, y: HEIGHT - 15, "text-anchor": "middle",
+                                 "font-size": 16 }, data.text.x));
+    svg.appendChild(el("text", { x: 20, y: MARGIN.top + plotH / 2, "text-anchor": "middle", "font-size": 16,
+                                 transform: "rotate(-90 20 " + (MARGIN.top + plotH / 2) + ")" }, data.text.y));
+
+    // 图例
+    var legendStyles = [{ stroke: "blue", width: 2.5 }]
+      .concat(data.band ? [{ fill: "blue", opacity: 0.4 }] : [])
+      .concat([{ stroke: "red", width: 1.5, dash: "8 5" }])
+      .concat(data.zones.map(function (zone) { return { fill: zone[2] }; }));
+    var legendX = MARGIN.left + plotW - 230, legendY = MARGIN.top + 10;
+    svg.appendChild(el("rect", { x: legendX, y: legendY, width: 220, height: 22 * legendStyles.length + 10,
+                                 fill: "white", "fill-opacity": 0.8, stroke: "#ccc", rx: 4 }));
+    legendStyles.forEach(function (style, i) {
+      var rowY = legendY + 20 + 22 * i;
+      if (style.fill) {
+        svg.appendChild(el("rect", { x: legendX + 10, y: rowY - 8, width: 30, height: 12,
+                                     fill: style.fill, "fill-opacity": style.opacity || 0.2 }));
+      } else {
+        svg.appendChild(el("line", { x1: legendX + 10, x2: legendX + 40, y1: rowY - 2, y2: rowY - 2,
+                                     stroke: style.stroke, "stroke-width": style.width,
+                                     "stroke-dasharray": style.dash || "none" }));
+      }
+      svg.appendChild(el("text", { x: legendX + 48, y: rowY + 3, "font-size": 13 }, data.text.legend[i]));
+    });
+
+    container.appendChild(svg);
+  }
+
+  var binding = new Shiny.OutputBinding();
+  $.extend(binding, {
+    find: function (scope) { return $(scope).find(".motivation-chart-output"); },
+    renderValue: function (el, data) { draw(el, data); }
+  });
+  Shiny.outputBindings.register(binding, "burnout.motivationChart");
+})();